@@ -0,0 +1,64 @@
+"""
+Micro-benchmark for URL canonicalization.
+
+Run from src/:  python -m benchmarks.canonicalize_bench [--urls 200000]
+Reports normalizations/sec and how many raw URL spellings collapse into one canonical URL.
+"""
+import argparse
+import random
+import time
+from crawler.canonicalize import UrlCanonicalizer, load_canonicalizer
+
+
+HOSTS = ["ekantipur.com", "setopati.com", "onlinekhabar.com", "nagariknews.nagariknetwork.com"]
+PATHS = ["/news/2024/05/12/{n}", "/politics/{n}", "/story/{n}/", "/category/sports/page/{n}", "/?p={n}"]
+
+
+def make_urls(count, pages=500, seed=42):
+    """Synthetic links where every page is spelled several ways, like real anchors on news sites"""
+    rng = random.Random(seed)
+    urls = []
+    for _ in range(count):
+        host = rng.choice(HOSTS)
+        path = rng.choice(PATHS).format(n=rng.randrange(pages))
+        scheme = rng.choice(["http", "https"])
+        www = rng.choice(["", "www."])
+        params = []
+        if rng.random() < 0.3:
+            params.append(f"utm_source={rng.choice(['facebook', 'twitter'])}")
+        if rng.random() < 0.1:
+            params.append(f"fbclid={rng.getrandbits(32):x}")
+        if rng.random() < 0.2:
+            params += ["b=2", "a=1"] if rng.random() < 0.5 else ["a=1", "b=2"]
+        if "?" in path:
+            path, existing = path.split("?")
+            params.append(existing)
+        query = ("?" + "&".join(params)) if params else ""
+        fragment = rng.choice(["", "", "#comments", "#top"])
+        slash = "/" if rng.random() < 0.3 and not path.endswith("/") else ""
+        urls.append(f"{scheme}://{www}{host}{path}{slash}{query}{fragment}")
+    return urls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="URL canonicalization benchmark")
+    parser.add_argument('--urls', type=int, default=200000)
+    parser.add_argument('--seed-config', action='store_true', help="Use rules from assests/seed_domain.json")
+    args = parser.parse_args()
+
+    canonicalizer = load_canonicalizer() if args.seed_config else UrlCanonicalizer()
+    urls = make_urls(args.urls)
+
+    started = time.perf_counter()
+    canonical = [canonicalizer(url) for url in urls]
+    elapsed = time.perf_counter() - started
+
+    raw_unique = len(set(urls))
+    canonical_unique = len(set(canonical))
+    print(f"{len(urls)} URLs canonicalized in {elapsed:.2f}s -> {len(urls) / elapsed:,.0f} normalizations/sec")
+    print(f"Distinct raw URLs: {raw_unique}, distinct canonical URLs: {canonical_unique} "
+          f"({raw_unique - canonical_unique} duplicate renders avoided, {raw_unique / canonical_unique:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Micro-benchmark for the database query layer against a local Postgres (settings from .env).
+
+Run from src/:  python -m benchmarks.db_pipeline_bench [--statements 2000]
+Runs the per-URL status update the crawler issues, on a temporary copy of crawled_url, four ways:
+  helpers    one UPDATE + COMMIT per call, each awaited (the old table helpers)
+  prepared   the same with a server-side prepared statement
+  pipeline   the same inside conn.pipeline(): each UPDATE goes out with its COMMIT, one round trip per pair
+  batched    one unnest() UPDATE for every change (what WriteBehindBuffer sends)
+and reports statements/sec for each.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from database.setup import get_connection, return_connection, close_all_connections
+
+
+UPDATE_SQL = """
+    UPDATE bench_crawled_url
+    SET crawl_status = %s, crawled_at = %s
+    WHERE crawl_id = %s
+"""
+
+BATCH_SQL = """
+    UPDATE bench_crawled_url c
+    SET crawl_status = u.crawl_status, crawled_at = u.crawled_at
+    FROM unnest(%s::bigint[], %s::text[], %s::timestamp[]) AS u(crawl_id, crawl_status, crawled_at)
+    WHERE c.crawl_id = u.crawl_id
+"""
+
+
+async def setup_table(conn, rows):
+    async with conn.cursor() as cursor:
+        await cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS bench_crawled_url (
+                crawl_id BIGINT PRIMARY KEY,
+                crawl_status TEXT NOT NULL,
+                crawled_at TIMESTAMP
+            )
+        """)
+        await cursor.execute("TRUNCATE bench_crawled_url")
+        await cursor.execute("""
+            INSERT INTO bench_crawled_url
+            SELECT g, 'queued', NULL FROM generate_series(1, %s) AS g
+        """, (rows,))
+    await conn.commit()
+
+
+async def run_helpers(conn, ids):
+    for crawl_id in ids:
+        async with conn.cursor() as cursor:
+            await cursor.execute(UPDATE_SQL, ('visited', datetime.now(), crawl_id), prepare=False)
+        await conn.commit()
+
+
+async def run_prepared(conn, ids):
+    for crawl_id in ids:
+        async with conn.cursor() as cursor:
+            await cursor.execute(UPDATE_SQL, ('visited', datetime.now(), crawl_id), prepare=True)
+        await conn.commit()
+
+
+async def run_pipeline(conn, ids):
+    # Every UPDATE is still its own transaction. commit() syncs the pipeline and waits for the
+    # results, so this saves the separate COMMIT round trip, not the wait on each UPDATE
+    async with conn.pipeline():
+        for crawl_id in ids:
+            async with conn.cursor() as cursor:
+                await cursor.execute(UPDATE_SQL, ('visited', datetime.now(), crawl_id), prepare=True)
+            await conn.commit()
+
+
+async def run_batched(conn, ids):
+    now = datetime.now()
+    async with conn.cursor() as cursor:
+        await cursor.execute(BATCH_SQL, (list(ids), ['visited'] * len(ids), [now] * len(ids)), prepare=True)
+    await conn.commit()
+
+
+MODES = [
+    ("helpers", run_helpers),
+    ("prepared", run_prepared),
+    ("pipeline", run_pipeline),
+    ("batched", run_batched),
+]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Database query layer benchmark")
+    parser.add_argument('--statements', type=int, default=2000)
+    args = parser.parse_args()
+
+    conn = await get_connection()
+    try:
+        ids = list(range(1, args.statements + 1))
+        baseline = None
+        for name, run in MODES:
+            await setup_table(conn, args.statements)
+            started = time.perf_counter()
+            await run(conn, ids)
+            elapsed = time.perf_counter() - started
+            rate = args.statements / elapsed
+            baseline = baseline or rate
+            print(f"{name:<9} {args.statements} updates in {elapsed:.2f}s -> {rate:,.0f} statements/sec ({rate / baseline:.1f}x)")
+    finally:
+        await return_connection(conn)
+        await close_all_connections()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
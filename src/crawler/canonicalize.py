@@ -0,0 +1,133 @@
+import json
+from urllib.parse import urlsplit, urlunsplit, unquote_plus
+from status.logger import logger
+
+
+# Rules applied to every domain unless the seed config overrides them
+DEFAULT_RULES = {
+    'scheme': 'https',            # force this scheme (None keeps the original)
+    'strip_www': True,            # www.example.com -> example.com
+    'drop_fragment': True,        # #comments, #top ...
+    'trailing_slash': 'strip',    # 'strip', 'add' or 'keep' (the root path is always '/')
+    'drop_params': ['utm_*', 'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga', 'igshid'],
+    'keep_params': None,          # if a list, only these query parameters survive
+    'sort_params': True,          # ?b=2&a=1 -> ?a=1&b=2
+    'lowercase_path': False,
+}
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+class _CompiledRules:
+    """DEFAULT_RULES merged with a domain override, with parameter patterns pre-split for speed"""
+
+    __slots__ = ('scheme', 'strip_www', 'drop_fragment', 'trailing_slash', 'drop_exact',
+                 'drop_prefixes', 'keep_params', 'sort_params', 'lowercase_path')
+
+    def __init__(self, rules):
+        self.scheme = rules['scheme']
+        self.strip_www = rules['strip_www']
+        self.drop_fragment = rules['drop_fragment']
+        self.trailing_slash = rules['trailing_slash']
+        patterns = [p.lower() for p in rules['drop_params'] or []]
+        self.drop_exact = frozenset(p for p in patterns if not p.endswith('*'))
+        self.drop_prefixes = tuple(p[:-1] for p in patterns if p.endswith('*'))
+        keep = rules['keep_params']
+        self.keep_params = frozenset(p.lower() for p in keep) if keep is not None else None
+        self.sort_params = rules['sort_params']
+        self.lowercase_path = rules['lowercase_path']
+
+    def keeps(self, name):
+        name = name.lower()
+        if self.keep_params is not None:
+            return name in self.keep_params
+        return name not in self.drop_exact and not name.startswith(self.drop_prefixes)
+
+
+class UrlCanonicalizer:
+    """
+    Turns the many spellings of one page into a single URL before it is hashed:
+    scheme, www., default ports, fragments, trailing slashes, tracking parameters
+    and parameter order. Rules can be overridden per domain from the seed config.
+    """
+
+    def __init__(self, default_rules=None, overrides=None):
+        self.default_rules = {**DEFAULT_RULES, **(default_rules or {})}
+        self._default = _CompiledRules(self.default_rules)
+        self._overrides = {
+            self._domain_key(domain): _CompiledRules({**self.default_rules, **rules})
+            for domain, rules in (overrides or {}).items()
+        }
+
+    @staticmethod
+    def _domain_key(host):
+        host = host.lower()
+        return host[4:] if host.startswith('www.') else host
+
+    def rules_for(self, host):
+        if not self._overrides:
+            return self._default
+        return self._overrides.get(self._domain_key(host), self._default)
+
+    def canonicalize(self, url):
+        """The canonical spelling of url, or None if it cannot be parsed (bad port, broken IPv6 host)"""
+        try:
+            parts = urlsplit(url.strip())
+            port = parts.port
+        except ValueError:
+            return None
+        scheme = parts.scheme.lower()
+        if scheme not in ('http', 'https'):
+            return url
+
+        host = (parts.hostname or '').rstrip('.')
+        rules = self.rules_for(host)
+
+        if rules.strip_www and host.startswith('www.'):
+            host = host[4:]
+
+        # The port is judged before the scheme is forced: http://host:80/ is https://host/, not https://host:80/
+        # hostname drops the brackets of an IPv6 literal
+        netloc = f"[{host}]" if ':' in host else host
+        if port is not None and str(port) not in (DEFAULT_PORTS[scheme], DEFAULT_PORTS.get(rules.scheme or scheme)):
+            netloc = f"{netloc}:{port}"
+        if rules.scheme:
+            scheme = rules.scheme
+
+        path = parts.path or '/'
+        if rules.lowercase_path:
+            path = path.lower()
+        if path != '/':
+            if rules.trailing_slash == 'strip':
+                path = path.rstrip('/') or '/'
+            elif rules.trailing_slash == 'add' and not path.endswith('/'):
+                path += '/'
+
+        query = parts.query
+        if query:
+            # Raw name=value tokens are filtered and reordered but never decoded and re-encoded,
+            # so ?amp, %20 and reserved characters keep the spelling the site uses
+            params = [token for token in query.split('&') if token and rules.keeps(unquote_plus(token.split('=', 1)[0]))]
+            if rules.sort_params:
+                # Sort by name only so repeated parameters keep their relative order
+                params.sort(key=lambda token: token.split('=', 1)[0])
+            query = '&'.join(params)
+
+        fragment = '' if rules.drop_fragment else parts.fragment
+        return urlunsplit((scheme, netloc, path, query, fragment))
+
+    __call__ = canonicalize
+
+
+def load_canonicalizer(path='assests/seed_domain.json'):
+    """Build a UrlCanonicalizer from the optional "canonicalization" section of the seed config"""
+    try:
+        with open(path, 'r') as f:
+            config = json.load(f).get('canonicalization', {})
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read canonicalization rules from {path}, using defaults: {e}")
+        config = {}
+
+    canonicalizer = UrlCanonicalizer(config.get('default'), config.get('overrides'))
+    logger.info(f"Loaded URL canonicalization rules ({len(canonicalizer._overrides)} domain overrides)")
+    return canonicalizer
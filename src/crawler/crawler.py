@@ -1,38 +1,43 @@
-from middleware.scroller_pager import SeleniumScroller
+from middleware.browser_pool import BrowserPool
+from middleware.async_scroller import AsyncBrowserPool
+from middleware.static_fetcher import StaticFetcher
+from middleware.resource_blocker import load_resource_blocker
+from middleware.yield_policy import load_yield_rules
 import argparse
 import asyncio
 import hashlib
-from database.setup import get_connection, return_connection, close_all_connections
-from database.table.seed_domain import create_seed_domain_table, insert_into_seed_domain_table, fetch_domain_url, update_completed_at, update_status, update_depth
-from database.table.crawled_url import create_crawled_url_table, insert_into_crawled_url_table, fetch_crawled_url, update_crawled_url_status, update_unique_links
-from database.table.url_relationship import create__url_relationship_table, insert_into_url_relationship_table
+import os
+import socket
+import time
+from database.setup import initialize_pool, get_connection, return_connection, close_all_connections
+from database.table.seed_domain import insert_into_seed_domain_table, fetch_domain_url
+from database.table.crawled_url import insert_into_crawled_url_table, bulk_insert_into_crawled_url_table, increment_unique_links, reconcile_unique_links, requeue_in_progress_urls, requeue_due_revisits
+from database.table.url_relationship import bulk_insert_into_url_relationship_table
+from database.identity import format_id
+from database.migrations import run_migrations
+from crawler.canonicalize import load_canonicalizer
+from crawler.frontier import Frontier
+from crawler.write_buffer import WriteBehindBuffer
+from crawler.revisit import is_revisitable, link_digest, next_interval
+from crawler.site_profile import SiteProfileStore
+from crawler.parallel_pager import ParallelPager
+from crawler.seen_filter import SeenUrlFilter, warm_seen_filter, KNOWN, MAYBE, NEW
 from status.logger import logger
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse, urljoin
 from datetime import datetime
 
 
+DRIVER_PATH = r'C:\Program Files\chromedriver-win64\chromedriver.exe'
 
-# Helper funciton to check the status of the url_path
-async def check_status_of_url(conn, url_path):
-    async with conn.cursor() as cursor:
-        query = """
-            SELECT 1 from crawled_url
-            WHERE url_path = %s AND crawl_status ='visited'
-            LIMIT 1     
-        """
-        await cursor.execute(query, (url_path,))
-        result = await cursor.fetchone()
-    return result is not None
+# How long an idle worker waits before re-checking the frontier while others are busy
+IDLE_POLL_SECONDS = 2.0
 
-# Helper function to get crawl_id by url_hash
-async def get_crawl_id_by_hash(conn, url_hash):
-    """Get crawl_id for a given URL hash"""
-    query = "SELECT crawl_id FROM crawled_url WHERE url_hash = %s"
-    async with conn.cursor() as cursor:
-        await cursor.execute(query, (url_hash,))
-        result = await cursor.fetchone()
-    return result[0] if result else None
+# In re-crawl mode, how often a worker with nothing to do looks for pages due for a revisit
+RECRAWL_POLL_SECONDS = 60.0
+
+def hash_url(url_path):
+    """20-byte SHA-1 of a URL, the identity key of crawled_url"""
+    return hashlib.sha1(url_path.encode('utf-8')).digest()
 
 
 # Helper function for PostgreSQL
@@ -45,247 +50,508 @@ async def check_url_hash_exists(conn, url_hash):
     return result is not None
 
 
-async def insert_seed_domain_in_crawled_url(conn):
-    url = await fetch_domain_url(conn)
-    domain_id = url[0]
-    url_path = 'https://'+url[1]+'/'
-    url_hash = hashlib.sha1(url_path.encode('utf-8')).hexdigest()
+async def url_hash_seen(conn, seen_filter, url_hash):
+    """check_url_hash_exists() that asks the in-memory seen filter before going to SQL"""
+    if seen_filter is not None:
+        status, _ = seen_filter.lookup(url_hash)
+        if status == NEW:
+            return False
+        if status == KNOWN:
+            return True
+    return await check_url_hash_exists(conn, url_hash)
+
+
+def split_known_children(seen_filter, children):
+    """
+    Split a page's children into URLs known to be stored ({url_hash: crawl_id}), rows
+    that still go through the upsert, and the Bloom "maybe" hashes among those rows.
+    """
+    if seen_filter is None:
+        return {}, list(children.values()), set()
     
-    # Check if url_hash already exists in crawled_url_table
-    existing_url = await check_url_hash_exists(conn, url_hash)
-    if existing_url:
-        # Return the existing domain_id and url_path
-        return 
+    known = {}
+    maybe = set()
+    for url_hash in children:
+        status, crawl_id = seen_filter.lookup(url_hash)
+        if status == KNOWN:
+            known[url_hash] = crawl_id
+        elif status == MAYBE:
+            maybe.add(url_hash)
     
+    return known, [row for url_hash, row in children.items() if url_hash not in known], maybe
+
+
+async def insert_seed_domain_in_crawled_url(conn, domain_id, url_path, url_hash):
+    """
+    Insert the seed URL of the domain this worker has already claimed; the unique-links bump
+    happens in the same transaction and only if the row is new. Returns the seed's crawl_id.
+    """
     depth = 0
-    await insert_into_crawled_url_table(conn, domain_id, url_path, url_hash, depth, None, None)
-    
-    # Return both domain_id and url_path for easier use
-    return domain_id, url_path
+    try:
+        crawl_id, inserted = await insert_into_crawled_url_table(conn, domain_id, url_path, url_hash, depth, None, None)
+        if inserted:
+            await increment_unique_links(conn, domain_id, 1)
+        await conn.commit()
+        return crawl_id
+    except Exception as e:
+        await conn.rollback()
+        logger.error(f'Error inserting seed URL {url_path}: {e}')
+        return None
 
 
-async def crawl_in_loop(conn, urls, domain_id, depth, base_url, parent_crawl_id, parent_url_content):
+async def crawl_in_loop(conn, urls, domain_id, depth, base_url, parent_crawl_id, parent_url_content, seen_filter=None, canonicalizer=None):
     """
-    Process discovered URLs and establish parent-child relationships
+    Process discovered URLs and establish parent-child relationships.
+    All children of the page and their edges are written in a single transaction.
     
     Args:
         conn: Database connection
-        urls: List of HTML strings containing <a> tags
+        urls: Iterable of LinkRecord(href, text)
         domain_id: Domain ID for the URLs
         depth: Current crawling depth
         base_url: Base URL for resolving relative URLs
         parent_crawl_id: The crawl_id of the parent URL
         parent_url_content: The url_content of the parent URL
+        seen_filter: Optional SeenUrlFilter consulted before any SQL
+        canonicalizer: Optional UrlCanonicalizer applied before hashing
+    
+    Returns the link digest of the page's children, or None if they could not be stored.
     """
     base_domain = urlparse(base_url).netloc
- 
-  
-    parent_url_hash = hashlib.sha1(base_url.encode('utf-8')).hexdigest()
     
-    for url in urls:
-        try:
+    # url_hash -> (url_path, url_hash, url_content); the first anchor text seen for a URL wins
+    children = {}
+    for url_path, content in urls:
+        if not url_path:
+            continue
         
-            soup = BeautifulSoup(url, 'html.parser')
-            a_tag = soup.find('a')
-            
-            if not a_tag or not a_tag.get('href'):
-                continue
-                
-            url_path = a_tag['href']
-          
-      
+        try:
             # Handle relative URLs
             if not url_path.startswith('http'):
                 url_path = urljoin(base_url, url_path)
-                
             
+            # One spelling per page, so variants of a URL share a hash and a render
+            if canonicalizer is not None:
+                url_path = canonicalizer(url_path)
+                if url_path is None:
+                    continue
+                
             # Only process URLs from same domain
             if urlparse(url_path).netloc.replace('www.', '') != base_domain.replace('www.', '') or "/page/" in url_path:
                 continue
-
-                
-            url_hash = hashlib.sha1(url_path.encode('utf-8')).hexdigest()
-            content = a_tag.get_text(strip=True)
+        except ValueError as e:
+            # One malformed href must not cost the page its other links
+            logger.warning(f"Skipping malformed URL {url_path!r} in crawl_in_loop: {e}")
+            continue
             
-            if content:  # Only if there's actual content
-                # Insert child URL into crawled_url table (allow duplicates)
-                await insert_into_crawled_url_table(conn, domain_id, url_path, url_hash, depth, content, None)
-                logger.info(f"Inserted child URL: {url_path}")
-                
-                try:
-                    await update_unique_links(conn, domain_id)
-                except Exception as e:
-                    logger.info(f'Error updating unique links: {e}')
-                
-                # Get the child_crawl_id for the newly inserted URL
-                child_crawl_id = await get_crawl_id_by_hash(conn, url_hash)
+        # Only links with actual content are stored
+        if not content:
+            continue
             
-            if child_crawl_id and parent_crawl_id:
-                # Insert parent-child relationship
-                await insert_into_url_relationship_table(
+        url_hash = hash_url(url_path)
+        children.setdefault(url_hash, (url_path, url_hash, content))
+    
+    if not children:
+        return link_digest(())
+    
+    started = time.perf_counter()
+    try:
+        # Children known to be stored only need their edge; the rest go through the upsert,
+        # which returns the crawl_id of every row, new or already present
+        child_ids, to_upsert, maybe = split_known_children(seen_filter, children)
+        upserted_ids, new_hashes = await bulk_insert_into_crawled_url_table(conn, domain_id, depth, to_upsert)
+        child_ids.update(upserted_ids)
+        
+        # The upsert's ids are needed before the edges can be written; after that the
+        # counter bump, the edge insert and the COMMIT share one round trip
+        edges = 0
+        async with conn.pipeline(), conn.cursor() as edge_cursor:
+            # Count only hashes this upsert actually inserted, in the same transaction
+            await increment_unique_links(conn, domain_id, len(new_hashes))
+            
+            if parent_crawl_id:
+                # Existing edges are skipped by ON CONFLICT; the rowcount is filled in by the sync
+                await bulk_insert_into_url_relationship_table(
                     conn,
                     domain_id=domain_id,
                     parent_url_id=parent_crawl_id,
-                    child_url_id=child_crawl_id,
+                    child_url_ids=list(child_ids.values()),
                     parent_depth=depth - 1,  # Parent is one level up
                     child_depth=depth,
                     parent_link_text=parent_url_content,  # Use parent's url_content
-                    discovered_at=datetime.now()
+                    discovered_at=datetime.now(),
+                    cursor=edge_cursor
                 )
-                logger.info(f"Created relationship: {parent_crawl_id} -> {child_crawl_id}")
+            
+            await conn.commit()
+            # The COMMIT synced the pipeline, so the edge insert's rowcount is known now
+            if parent_crawl_id and child_ids:
+                edges = max(edge_cursor.rowcount, 0)
+    except Exception as e:
+        await conn.rollback()
+        logger.error(f"Error persisting links found on {base_url}: {e}")
+        return None
+    
+    if seen_filter is not None:
+        # A Bloom "maybe" that the upsert had to insert was a false positive
+        seen_filter.record_false_positive(len(maybe & new_hashes))
+        for url_hash, crawl_id in upserted_ids.items():
+            seen_filter.add(url_hash, crawl_id)
+    
+    elapsed = time.perf_counter() - started
+    rows = len(new_hashes) + edges
+    logger.info(
+        f"Persisted {len(new_hashes)} new child URLs ({len(child_ids) - len(new_hashes)} already stored) "
+        f"and edges to {edges} children from {base_url} "
+        f"in {elapsed:.3f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)"
+    )
+    return link_digest(children)
+
+
+class CrawlState:
+    """State shared by all async workers of one crawler process"""
+    
+    def __init__(self, frontier, seen_filter, canonicalizer, writes, static_fetcher=None, recrawl=False, site_profiles=None, pager=None):
+        # Per-domain priority queues the workers pop URLs from
+        self.frontier = frontier
+        # Write-behind buffer for URL status and domain progress updates
+        self.writes = writes
+        # In-memory dedupe in front of crawled_url
+        self.seen_filter = seen_filter
+        # URL normalisation applied before every hash
+        self.canonicalizer = canonicalizer
+        # HTTP fast path tried before the browser (None disables it)
+        self.static_fetcher = static_fetcher
+        # Serialises picking a seed domain and inserting its seed URL
+        self.domain_lock = asyncio.Lock()
+        # Pages currently being rendered; while > 0 an empty frontier may still grow
+        self.active_pages = 0
+        # Keep running and revisit listing pages as they come due instead of exiting
+        self.recrawl = recrawl
+        # Per-domain load-more, pagination and scroll strategies that worked before
+        self.site_profiles = site_profiles or SiteProfileStore()
+        # Concurrent fetcher for URL-based pagination (None walks the pages in one browser)
+        self.pager = pager
+
+
+async def render_page(browser_pool, url, profile=None, pager=None):
+    """
+    Render one page in a pooled browser; profile is the domain's SiteProfile and pager an
+    optional ParallelPager that takes over URL-based pagination when it fetches concurrently.
+    Returns the page's links and its yield curves (new links per scroll and per page).
+    """
+    links = set()
+    yield_curve = None
+    page_yield = None
+    numbered_link = None
+    
+    # Borrow a warm browser from the pool; its blocking calls run on the pool's threads
+    async with browser_pool.lease() as scroller:
+        # Scroll and get links
+        result, scroller_links = await scroller.scroll_to_bottom(
+            url, 
+            scroll_pause_time=7.0, 
+            max_scrolls=200,
+            profile=profile
+        )
+        
+        if scroller_links:
+            links.update(scroller_links)
+    
+        if result:
+            logger.info("Successfully completed scrolling")
+            try:
+                paged, pager_links = await scroller.pagination(defer_url_pages=pager is not None and pager.concurrency > 1)
+                if pager_links:
+                    links.update(pager_links)
                 
+                if paged:
+                    logger.info("Successfully completed pagination")
+                    
+            except asyncio.TimeoutError:
+                logger.info('Pagination timed out, keeping links found so far')
+            except Exception:
+                logger.info('No Pagination found')
+        
+        page_yield = scroller.page_yield
+        numbered_link = scroller.url_pagination
+    
+    # The browser is back in the pool before the numbered pages fan out across it
+    if numbered_link and page_yield is not None:
+        try:
+            links.update(await pager.run(numbered_link, page_yield.track('url', 'pages')))
         except Exception as e:
-            logger.warning(f"Error processing URL in crawl_in_loop: {e}")
-            continue
+            logger.info(f"Concurrent pagination failed: {e}")
+    
+    if page_yield is not None:
+        yield_curve = page_yield.as_dict()
+    
+    return links, yield_curve
 
 
-async def scroller_pager(conn):
-    unique_urls = set()
+async def fetch_page_links(browser_pool, static_fetcher, url, profile=None, pager=None, fetched=None):
+    """
+    Links of a page: plain HTTP first, Selenium only when the page needs JavaScript.
+    fetched is a response the static fetcher already has for the URL (a revalidation's 200).
+    Returns (links, yield_curve, validators); the curve is None for a static page without
+    pagination, and validators is the page's (etag, last_modified) when it was fetched statically.
+    """
+    if static_fetcher is not None:
+        static = await static_fetcher.fetch_links(url, fetched)
+        if static is not None:
+            links, etag, last_modified = static
+            numbered_link = static_fetcher.numbered_page_link(url, links) if pager is not None else None
+            if numbered_link is None:
+                return set(links), None, (etag, last_modified)
+            # A plain numbered listing: pages 2..N are as static as the first one
+            page_links, yield_curve = await pager.follow(url, numbered_link)
+            return set(links) | page_links, yield_curve, (etag, last_modified)
     
+    links, yield_curve = await render_page(browser_pool, url, profile, pager)
+    return links, yield_curve, None
+
+
+async def scroller_pager(conn, browser_pool, state, worker_id=0):
     # Main loop to process all seed domains
+    idle = False
     while True:
-        # Check if we need to insert seed domain
-        url = await fetch_domain_url(conn)
-        
-        # If no more domains to process, exit
-        if not url:
-            logger.info("No more seed domains to process - all domains completed!")
-            break
+        if idle:
+            await asyncio.sleep(RECRAWL_POLL_SECONDS)
+        async with state.domain_lock:
+            # Check if we need to insert seed domain
+            url = await fetch_domain_url(conn, state.frontier.owner, state.frontier.lease_seconds)
+            if not url and state.recrawl and await requeue_due_revisits(conn):
+                url = await fetch_domain_url(conn, state.frontier.owner, state.frontier.lease_seconds)
+            idle = not url
             
-        domain_id = url[0]
-        seed_url = 'https://'+url[1]+'/'
-        max_depth = url[2]
-        url_hash = hashlib.sha1(seed_url.encode('utf-8')).hexdigest()
-        
-        logger.info(f"Starting to process seed domain: {seed_url}")
+            # If no more domains to process, exit (or, re-crawling, wait for the next revisit)
+            if not url:
+                if state.recrawl:
+                    continue
+                logger.info(f"[worker {worker_id}] No more seed domains to process - all domains completed!")
+                break
+                
+            domain_id = url[0]
+            seed_url = state.canonicalizer('https://'+url[1]+'/')
+            max_depth = url[2]
+            url_hash = hash_url(seed_url)
+            
+            logger.info(f"[worker {worker_id}] Starting to process seed domain {format_id('domain', domain_id)}: {seed_url}")
+            
+            # Only insert seed domain if hash doesn't exist
+            seed_exists = await url_hash_seen(conn, state.seen_filter, url_hash)
+            if not seed_exists:
+                seed_crawl_id = await insert_seed_domain_in_crawled_url(conn, domain_id, seed_url, url_hash)
+                if seed_crawl_id is not None:
+                    state.seen_filter.add(url_hash, seed_crawl_id)
+                logger.info(f"Inserted seed domain: {seed_url}")
+            else:
+                logger.info(f"Seed domain already exists: {seed_url}")
         
-        # Only insert seed domain if hash doesn't exist
-        seed_exists = await check_url_hash_exists(conn, url_hash)
-        if not seed_exists:
-            domain_id, seed_url = await insert_seed_domain_in_crawled_url(conn)
-            logger.info(f"Inserted seed domain: {seed_url}")
-        else:
-            logger.info(f"Seed domain already exists: {seed_url}")
+        profile = await state.site_profiles.get(conn, domain_id)
         
         # Inner crawling loop for current domain - keep processing until no more URLs or max depth reached
         while True:
-            # Fetch next URL to process for current domain
-            url_data = await fetch_crawled_url(conn)
+            # Pop the highest-priority URL of this domain from the in-memory frontier
+            url_data = await state.frontier.next(domain_id)
             
             if not url_data:
-                logger.info(f"No more URLs to crawl for domain {seed_url} - moving to next domain!")
+                if state.active_pages > 0:
+                    # Other workers are still rendering pages that may add new URLs
+                    await asyncio.sleep(IDLE_POLL_SECONDS)
+                    continue
+                logger.info(f"[worker {worker_id}] No more URLs to crawl for domain {seed_url} - moving to next domain!")
                 break
                 
-            current_url, current_domain_id, current_depth, crawl_id = url_data
-            
-            # Check if we've already visited the current url
-            if await check_status_of_url(conn, current_url):
-                logger.info(f'The url:{current_url} already exists')
-                await update_crawled_url_status(conn, current_url, 'visited')
-                logger.info(f"Marked {current_url} as visited")
-                continue
+            current_url, current_domain_id, current_depth, crawl_id, current_url_content, *revisit_state = url_data
+            # Validators, link digest and interval from the previous visit (None on a first visit)
+            etag, last_modified, previous_digest, previous_interval = revisit_state
+            revisiting = previous_interval is not None
+            # Parent text for the relationships created from this page
+            current_url_content = current_url_content or ""
+            # No visited check: url_hash is unique and the frontier only claims 'not_visited' rows
                 
-            try:
-                await update_depth(conn, current_depth, domain_id)
-            except Exception as e:
-                logger.info(f'Error updating depth: {e}')
+            state.writes.set_domain_depth(domain_id, current_depth)
                 
             # Check if we've reached max depth for current domain
             if current_depth >= 1:
                 logger.info(f"Reached maximum depth of {max_depth} for domain {seed_url}")
+                # Hand the claim back so the URL is not stranded as queued/in_progress
+                state.writes.set_url_status(crawl_id, 'not_visited')
                 break  # Break inner loop to move to next domain
                 
-            logger.info(f"Processing: {current_url} at depth {current_depth}")
-            
-            # Clear previous URLs
-            unique_urls.clear()
-            
-            # Set up args (remove argparse since you're calling this programmatically)
-            driver_path = r'C:\Program Files\chromedriver-win64\chromedriver.exe'
+            logger.info(f"[worker {worker_id}] Processing: {current_url} at depth {current_depth}")
             
-            # Create scroller
-            scroller = SeleniumScroller(headless=True, driver_path=driver_path)
-
+            state.active_pages += 1
             try:
-                # Get the current URL's content for use as parent_url_content
-                current_url_query = "SELECT url_content FROM crawled_url WHERE crawl_id = %s"
-                async with conn.cursor() as cursor:
-                    await cursor.execute(current_url_query, (crawl_id,))
-                    result = await cursor.fetchone()
-                    current_url_content = result[0] if result and result[0] else ""
+                fetched = None
+                if revisiting and state.static_fetcher is not None:
+                    # A conditional GET costs one request; a 304 saves the whole render
+                    validation = await state.static_fetcher.revalidate(current_url, etag, last_modified)
+                    if validation is not None:
+                        status, etag, last_modified, fetched = validation
+                        if status == 304:
+                            logger.info(f"{current_url} not modified since the last visit, skipping the render")
+                            state.writes.set_url_status(crawl_id, 'visited')
+                            state.writes.set_revisit_state(
+                                crawl_id, etag, last_modified, previous_digest, next_interval(previous_interval, changed=False)
+                            )
+                            continue
+                        if status != 200:
+                            fetched = None
                 
-                # Scroll and get links
-                result, scroller_links = scroller.scroll_to_bottom(
-                    current_url, 
-                    scroll_pause_time=7.0, 
-                    max_scrolls=200
+                # Browser work runs off the event loop so other workers keep persisting
+                unique_urls, yield_curve, validators = await fetch_page_links(
+                    browser_pool, state.static_fetcher, current_url, profile, state.pager, fetched
                 )
-                
-                if scroller_links:
-                    unique_urls.update(scroller_links)
-            
-                if result:
-                    logger.info("Successfully completed scrolling")
-                    try:
-                        pager, pager_links = scroller.pagination()
-                        if pager_links:
-                            unique_urls.update(pager_links)
-                        
-                        if pager:
-                            logger.info("Successfully completed pagination")
-                            
-                    except:
-                        logger.info('No Pagination found')
+                if validators is not None:
+                    # Validators of the static response, so the next revisit can be a conditional GET
+                    etag = validators[0] or etag
+                    last_modified = validators[1] or last_modified
+                await state.site_profiles.save(conn, profile)
+                if yield_curve:
+                    state.writes.set_yield_curve(crawl_id, yield_curve)
                 
                 # Process found URLs and add to database with parent-child relationships
+                digest = link_digest(())
                 if unique_urls:
-                    await crawl_in_loop(
+                    digest = await crawl_in_loop(
                         conn, 
                         unique_urls, 
                         current_domain_id, 
                         current_depth + 1, 
                         current_url,
                         crawl_id, 
-                        current_url_content  
+                        current_url_content,
+                        state.seen_filter,
+                        state.canonicalizer
                     )
                 
                 # Mark current URL as visited
-                await update_crawled_url_status(conn, current_url, 'visited')
+                state.writes.set_url_status(crawl_id, 'visited')
                 logger.info(f"Marked {current_url} as visited")
+                
+                # Listing pages come back sooner while their links keep changing, later while they do not
+                if is_revisitable(current_url, current_depth) and digest is not None:
+                    changed = digest != previous_digest
+                    interval = next_interval(previous_interval, changed)
+                    state.writes.set_revisit_state(crawl_id, etag, last_modified, digest, interval)
+                    if revisiting:
+                        logger.info(f"{current_url} {'changed' if changed else 'unchanged'} since the last visit; next revisit in {interval}s")
                     
             except Exception as e:
                 logger.error(f"Error processing {current_url}: {e}")
-                await update_crawled_url_status(conn, current_url, 'error')
-                
+                state.writes.set_url_status(crawl_id, 'error')
             finally:
-                scroller.close()
+                state.active_pages -= 1
         
         # Update domain completion status after finishing all URLs for this domain
-        logger.info(f"Completed processing seed domain: {seed_url}")
-        try:
-            await update_completed_at(conn, domain_id)  
-            await update_status(conn, domain_id)        
-        except Exception as e:
-            logger.info(f'Error updating completed_at timestamp and status for domain {domain_id}: {e}')
+        logger.info(f"[worker {worker_id}] Completed processing seed domain: {seed_url}")
+        await state.frontier.release_domain(domain_id)
+        await state.site_profiles.save(conn, profile)
+        state.site_profiles.forget(domain_id)
+        state.frontier.log_metrics()
+        browser_pool.log_metrics()
+        state.seen_filter.log_metrics()
+        if state.static_fetcher is not None:
+            state.static_fetcher.log_metrics()
+        await state.writes.complete_domain(domain_id)
+        state.writes.log_metrics()
         
-    logger.info("All seed domains have been processed!")
+    logger.info(f"[worker {worker_id}] All seed domains have been processed!")
+
+
+async def crawl_worker(worker_id, browser_pool, state):
+    """One crawl worker with its own pooled database connection"""
+    conn = await get_connection()
+    try:
+        await scroller_pager(conn, browser_pool, state, worker_id)
+    except Exception as e:
+        logger.error(f"[worker {worker_id}] Unexpected error: {e}")
+    finally:
+        await return_connection(conn)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="General news-site crawler")
+    parser.add_argument('--driver-path', default=DRIVER_PATH, help="Path to the chromedriver executable")
+    parser.add_argument('--workers', type=int, default=1, help="Number of concurrent crawl workers")
+    parser.add_argument('--browsers', type=int, default=None, help="Number of warm browsers kept in the pool (defaults to --workers)")
+    parser.add_argument('--recycle-after', type=int, default=50, help="Restart a browser after this many pages")
+    parser.add_argument('--page-timeout', type=float, default=1800, help="Seconds before a single browser call is aborted")
+    parser.add_argument('--no-block', action='store_true', help="Let the browser load fonts, media, ads and trackers")
+    parser.add_argument('--no-static', action='store_true', help="Always render with Selenium instead of trying plain HTTP first")
+    parser.add_argument('--page-concurrency', type=int, default=4, help="Numbered pagination pages fetched at once (1 walks them in a single browser)")
+    parser.add_argument('--frontier-batch', type=int, default=200, help="URLs reserved from the database per frontier refill")
+    parser.add_argument('--write-batch', type=int, default=500, help="Buffered status/depth changes that trigger a batched write")
+    parser.add_argument('--seen-cache-size', type=int, default=200000, help="URL hashes kept in the exact in-memory LRU")
+    parser.add_argument('--reconcile-counts', action='store_true', help="Recompute seed_domain.total_urls_found from crawled_url and exit")
+    parser.add_argument('--requeue-in-progress', action='store_true', help="Return every queued/in_progress row to the frontier, leased or not (only when no other crawler is running)")
+    parser.add_argument('--recrawl', action='store_true', help="Keep running and revisit listing pages on their adaptive interval")
+    parser.add_argument('--lease-seconds', type=int, default=120, help="How long a claimed URL or domain stays reserved without a heartbeat")
+    return parser.parse_args()
 
 
 async def main():
+    args = parse_args()
+    workers = max(1, args.workers)
+    
+    # One connection per worker plus the setup, frontier and write buffer connections
+    await initialize_pool(min_size=min(3, workers + 3), max_size=max(10, workers + 3))
     conn = await get_connection()
+    static_fetcher = None
+    frontier = None
+    writes = None
+    yield_rules = load_yield_rules()
+    browser_pool = AsyncBrowserPool(
+        BrowserPool(
+            size=args.browsers or workers,
+            headless=True,
+            driver_path=args.driver_path,
+            max_pages_per_browser=args.recycle_after,
+            blocker=load_resource_blocker(enabled=not args.no_block),
+            yield_rules=yield_rules
+        ),
+        timeout=args.page_timeout
+    )
     
     try:
-        await create_seed_domain_table(conn)
-        await create_crawled_url_table(conn)
-        await create__url_relationship_table(conn)
+        await run_migrations(conn)
         await insert_into_seed_domain_table(conn)
-        await scroller_pager(conn)
+        if args.reconcile_counts:
+            await reconcile_unique_links(conn)
+            return
+        if args.requeue_in_progress:
+            await requeue_in_progress_urls(conn)
+        
+        static_fetcher = None if args.no_static else StaticFetcher(concurrency=max(10, workers * 2))
+        seen_filter = SeenUrlFilter(exact_capacity=args.seen_cache_size)
+        await warm_seen_filter(conn, seen_filter)
+        # Leases are held per process; its workers share them
+        owner = f"{socket.gethostname()}:{os.getpid()}"
+        frontier = Frontier(owner, batch_size=args.frontier_batch, lease_seconds=args.lease_seconds)
+        await frontier.open()
+        writes = WriteBehindBuffer(max_pending=args.write_batch)
+        await writes.open()
+        # Walks numbered pages of static listings, and of rendered ones when --page-concurrency > 1
+        pager = ParallelPager(browser_pool, static_fetcher, max(1, args.page_concurrency), yield_rules)
+        state = CrawlState(frontier, seen_filter, load_canonicalizer(), writes, static_fetcher, recrawl=args.recrawl, pager=pager)
+        logger.info(f"Starting {workers} crawl worker(s)")
+        await asyncio.gather(*(crawl_worker(worker_id, browser_pool, state) for worker_id in range(workers)))
     except Exception as e:
         logger.error(f"Unexpected error in main execution: {e}")
     finally:
+        if writes is not None:
+            await writes.close()
+        if frontier is not None:
+            await frontier.close()
+        if static_fetcher is not None:
+            await static_fetcher.close()
+        browser_pool.close()
         if conn:
             await return_connection(conn)
             logger.info("Database connection closed")
+        await close_all_connections()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,222 @@
+import asyncio
+import heapq
+import itertools
+import re
+import time
+from urllib.parse import urlsplit
+from database.setup import get_connection, return_connection
+from database.identity import format_id
+from database.table.crawled_url import claim_crawled_url_batch, mark_crawled_urls_started, release_crawled_urls, renew_url_leases, reap_expired_leases
+from database.table.seed_domain import renew_domain_leases
+from status.logger import logger
+
+
+# Listing pages (sections, tags, archives, paginated lists) lead to many new links
+LISTING_PATTERN = re.compile(
+    r'/(category|categories|section|sections|tag|tags|topic|topics|author|archive|archives|list|page)(/|$)'
+    r'|[?&](cat|category_id|page|paged)='
+)
+# Article pages: dated paths, long numeric ids, .html leaves
+ARTICLE_PATTERN = re.compile(r'/\d{4}/\d{1,2}/\d{1,2}/|/\d{4,}(/|$|\?)|\.html?$|[?&]p=\d+')
+
+KIND_PENALTY = {'listing': 0, 'other': 20, 'article': 40}
+
+
+def classify_url(url_path):
+    """'listing', 'article' or 'other', from the URL shape alone"""
+    if LISTING_PATTERN.search(url_path):
+        return 'listing'
+    if ARTICLE_PATTERN.search(url_path):
+        return 'article'
+    return 'other'
+
+
+def score_url(depth, link_text, url_path):
+    """
+    Priority of a frontier URL; lower is crawled first.
+    Depth dominates, then listing before other before article, then short
+    navigation-style anchor text and shallow paths.
+    """
+    score = depth * 100 + KIND_PENALTY[classify_url(url_path)]
+
+    words = len(link_text.split()) if link_text else 0
+    if 0 < words <= 3:
+        score -= 5      # menu entries like "राजनीति" or "Sports"
+    elif words > 6:
+        score += 5      # headline text, almost always an article
+
+    score += urlsplit(url_path).path.count('/')
+    return score
+
+
+class Frontier:
+    """
+    Per-domain in-memory priority queues over crawled_url.
+
+    Rows are reserved from Postgres in batches ('not_visited' -> 'queued', SKIP LOCKED)
+    and popped from a heap in O(log n). The 'queued' -> 'in_progress' transitions of
+    popped URLs are flushed back in batches by a background task, and anything still
+    queued is released to 'not_visited' when the domain is finished or on shutdown.
+    The frontier holds its own pooled connection so it never competes with a worker's.
+
+    Every claim is a lease held by `owner` (one per crawler process). The background
+    task renews the leases of this process's URLs and domains - including pages being
+    rendered right now - and reaps rows whose owner stopped renewing, so a crashed
+    process's work goes back to the queue while a live one's is never taken.
+    """
+
+    def __init__(self, owner, batch_size=200, low_water=20, flush_interval=2.0, lease_seconds=120):
+        self.owner = owner
+        self.batch_size = batch_size
+        self.low_water = low_water
+        self.flush_interval = flush_interval
+        self.lease_seconds = lease_seconds
+        # Renew well before expiry so one slow round trip does not lose a lease
+        self.heartbeat_interval = lease_seconds / 4
+        self.reap_interval = lease_seconds / 2
+
+        self._heaps = {}
+        self._exhausted = set()
+        self._refills = {}
+        self._started = []
+        self._counter = itertools.count()
+        self._lock = asyncio.Lock()
+        self._conn = None
+        self._flush_task = None
+        # Set by close(); the maintenance loop finishes its current round and exits
+        self._closing = asyncio.Event()
+
+        self.stats = {'claimed': 0, 'popped': 0, 'refills': 0, 'released': 0, 'flushes': 0, 'heartbeats': 0, 'reaped': 0}
+
+    async def open(self):
+        self._conn = await get_connection()
+        # Whatever crashed crawlers left behind is claimable again before the first refill
+        await self.reap()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _refill(self, domain_id):
+        async with self._lock:
+            started = time.perf_counter()
+            rows = await claim_crawled_url_batch(self._conn, domain_id, self.batch_size, self.owner, self.lease_seconds)
+        heap = self._heaps.setdefault(domain_id, [])
+        for row in rows:
+            url_path, _, depth, _, url_content = row[:5]
+            score = score_url(depth, url_content, url_path)
+            heapq.heappush(heap, (score, next(self._counter), tuple(row)))
+        self.stats['claimed'] += len(rows)
+        self.stats['refills'] += 1
+        if len(rows) < self.batch_size:
+            self._exhausted.add(domain_id)
+        else:
+            self._exhausted.discard(domain_id)
+        logger.info(f"Frontier refilled {len(rows)} URLs for {format_id('domain', domain_id)} in {time.perf_counter() - started:.3f}s")
+
+    def _schedule_refill(self, domain_id):
+        task = self._refills.get(domain_id)
+        if task is None or task.done():
+            task = asyncio.create_task(self._refill(domain_id))
+            self._refills[domain_id] = task
+        return task
+
+    async def next(self, domain_id):
+        """
+        Pop the best URL of a domain, or None: (url_path, domain_id, depth, crawl_id, url_content,
+        etag, last_modified, link_digest, revisit_seconds) as claimed by claim_crawled_url_batch
+        """
+        heap = self._heaps.get(domain_id)
+        if not heap:
+            # Nothing buffered: wait for a refill (the domain may have gained URLs since it was exhausted)
+            await self._schedule_refill(domain_id)
+            heap = self._heaps.get(domain_id)
+            if not heap:
+                return None
+        elif len(heap) <= self.low_water and domain_id not in self._exhausted:
+            # Prefetch the next batch while the worker gets on with this URL
+            self._schedule_refill(domain_id)
+
+        _, _, url_data = heapq.heappop(heap)
+        self._started.append(url_data[3])
+        self.stats['popped'] += 1
+        return url_data
+
+    async def flush(self):
+        """Write the batched 'in_progress' transitions"""
+        if not self._started:
+            return
+        crawl_ids, self._started = self._started, []
+        try:
+            async with self._lock:
+                await mark_crawled_urls_started(self._conn, crawl_ids)
+        except BaseException:
+            # Cancelled mid-flush: the transitions go out with the next flush
+            self._started[:0] = crawl_ids
+            raise
+        self.stats['flushes'] += 1
+
+    async def heartbeat(self):
+        """Extend the leases of everything this process holds"""
+        async with self._lock:
+            await renew_url_leases(self._conn, self.owner, self.lease_seconds)
+            await renew_domain_leases(self._conn, self.owner, self.lease_seconds)
+        self.stats['heartbeats'] += 1
+
+    async def reap(self):
+        """Requeue URLs whose lease expired, whoever held them"""
+        async with self._lock:
+            self.stats['reaped'] += await reap_expired_leases(self._conn)
+
+    async def _flush_loop(self):
+        last_heartbeat = last_reap = time.monotonic()
+        while not self._closing.is_set():
+            try:
+                await asyncio.wait_for(self._closing.wait(), self.flush_interval)
+                break
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+                now = time.monotonic()
+                if now - last_heartbeat >= self.heartbeat_interval:
+                    await self.heartbeat()
+                    last_heartbeat = now
+                if now - last_reap >= self.reap_interval:
+                    await self.reap()
+                    last_reap = now
+            except Exception as e:
+                logger.error(f"Frontier maintenance failed: {e}")
+
+    async def release_domain(self, domain_id):
+        """Give a domain's still-queued URLs back to the table"""
+        task = self._refills.pop(domain_id, None)
+        if task is not None and not task.done():
+            await task
+        heap = self._heaps.pop(domain_id, [])
+        self._exhausted.discard(domain_id)
+        if heap:
+            async with self._lock:
+                await release_crawled_urls(self._conn, [entry[2][3] for entry in heap])
+            self.stats['released'] += len(heap)
+
+    def log_metrics(self):
+        buffered = sum(len(heap) for heap in self._heaps.values())
+        logger.info(
+            f"Frontier: claimed={self.stats['claimed']} popped={self.stats['popped']} "
+            f"refills={self.stats['refills']} flushes={self.stats['flushes']} "
+            f"released={self.stats['released']} heartbeats={self.stats['heartbeats']} "
+            f"reaped={self.stats['reaped']} buffered={buffered}"
+        )
+
+    async def close(self):
+        if self._conn is None:
+            return
+        try:
+            self._closing.set()
+            if self._flush_task is not None:
+                await self._flush_task
+            await self.flush()
+            for domain_id in list(self._heaps):
+                await self.release_domain(domain_id)
+        finally:
+            self.log_metrics()
+            await return_connection(self._conn)
+            self._conn = None
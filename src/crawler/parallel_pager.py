@@ -0,0 +1,104 @@
+import asyncio
+import time
+from middleware.scroller_pager import numbered_page_url
+from middleware.yield_policy import YieldRules
+from status.logger import logger
+
+
+class ParallelPager:
+    """
+    Fetches pages 2, 3, ... of a URL-paginated listing concurrently once the page-number
+    link is known. Each page goes over plain HTTP when the static fetcher can read it and
+    through a pooled browser otherwise, with at most `concurrency` pages in flight.
+
+    Results are judged in page order with the page's yield tracker, so the curve and the
+    stopping decision match a sequential walk: the first dry, missing or failed page stops
+    the walk. Fetches of later pages still in flight are left to finish, so their
+    browsers go back to the pool warm, and their results are discarded.
+    """
+
+    def __init__(self, browser_pool, static_fetcher=None, concurrency=4, yield_rules=None):
+        self.browser_pool = browser_pool
+        self.static_fetcher = static_fetcher
+        self.concurrency = concurrency
+        # Per-domain thresholds for pages whose yield is not already tracked by a browser render
+        self.yield_rules = yield_rules or YieldRules()
+
+    async def fetch_page(self, url):
+        """('ok', links) or ('not_found', []) for one numbered page"""
+        if self.static_fetcher is not None:
+            result = await self.static_fetcher.fetch_listing_page(url)
+            if result is not None:
+                return result
+        async with self.browser_pool.lease() as scroller:
+            return await scroller.load_page_links(url)
+
+    async def follow(self, url, first_link):
+        """Walk the numbered pages of a page fetched over plain HTTP; returns (links, yield_curve)"""
+        page_yield = self.yield_rules.for_url(url)
+        links = await self.run(first_link, page_yield.track('url', 'pages'))
+        return links, page_yield.as_dict()
+
+    async def run(self, first_link, tracker):
+        """Links of every numbered page fetched before the walk stopped"""
+        started = time.perf_counter()
+        links = set()
+        # Finished pages not judged yet: page number -> (status, links)
+        results = {}
+        in_flight = {}
+        next_page = 2
+        judged = 1
+        stopped = False
+        last_page = tracker.max_steps + 1
+
+        def launch():
+            nonlocal next_page
+            while len(in_flight) < self.concurrency and next_page <= last_page:
+                task = asyncio.create_task(self.fetch_page(numbered_page_url(first_link, next_page)))
+                in_flight[task] = next_page
+                next_page += 1
+
+        launch()
+        try:
+            while in_flight:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    page_num = in_flight.pop(task)
+                    try:
+                        results[page_num] = task.result()
+                    except Exception as e:
+                        logger.info(f"Page {page_num} failed: {e}")
+                        results[page_num] = ('error', [])
+
+                # Judge finished pages in order; a later page cannot be judged before an earlier one
+                while not stopped and judged + 1 in results:
+                    judged += 1
+                    status, page_links = results.pop(judged)
+                    if status != 'ok':
+                        logger.info(f"Page {judged}: {status}, stopping pagination")
+                        tracker.stop(status)
+                        stopped = True
+                        break
+                    links.update(page_links)
+                    new_links = tracker.observe(page_links)
+                    logger.info(f"Page {judged}: Found {len(page_links)} total links, {new_links} new links added")
+                    if tracker.exhausted:
+                        logger.info(f"Page {judged}: stopping pagination ({tracker.stop_reason}), last yields {tracker.curve[-5:]}")
+                        stopped = True
+
+                if stopped:
+                    # Everything still in flight is a later page; cancelling would abort its browser
+                    await asyncio.gather(*in_flight, return_exceptions=True)
+                    in_flight.clear()
+                else:
+                    launch()
+        finally:
+            # Only reached with fetches in flight when the caller itself is cancelled
+            for task in in_flight:
+                task.cancel()
+
+        logger.info(
+            f"Fetched numbered pages 2-{judged} ({self.concurrency} at a time) in "
+            f"{time.perf_counter() - started:.1f}s: {len(links)} links, stopped on {tracker.stop_reason}"
+        )
+        return links
@@ -0,0 +1,31 @@
+import hashlib
+from crawler.frontier import classify_url
+
+
+# Adaptive revisit interval for listing pages, in seconds
+INITIAL_REVISIT = 60 * 60           # first revisit an hour after discovery
+MIN_REVISIT = 15 * 60               # busy section fronts
+MAX_REVISIT = 7 * 24 * 60 * 60      # archives that never change
+BACKOFF = 2.0                       # unchanged: wait this much longer next time
+SPEEDUP = 0.5                       # changed: come back this much sooner
+
+
+def is_revisitable(url_path, depth):
+    """Only seeds and listing pages are re-crawled; articles do not grow new links"""
+    return depth == 0 or classify_url(url_path) == 'listing'
+
+
+def link_digest(url_hashes):
+    """Order-independent SHA-1 of a page's extracted link set"""
+    digest = hashlib.sha1()
+    for url_hash in sorted(url_hashes):
+        digest.update(url_hash)
+    return digest.digest()
+
+
+def next_interval(previous, changed):
+    """Seconds until the next visit: shrink while a page keeps changing, grow while it does not"""
+    if previous is None:
+        return INITIAL_REVISIT
+    interval = previous * (SPEEDUP if changed else BACKOFF)
+    return int(min(MAX_REVISIT, max(MIN_REVISIT, interval)))
@@ -0,0 +1,182 @@
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from database.table.crawled_url import iter_url_hashes
+from status.logger import logger
+
+
+# Results of SeenUrlFilter.lookup()
+KNOWN = 'known'      # in the exact LRU set, crawl_id available without SQL
+MAYBE = 'maybe'      # Bloom filter says probably seen; confirm with SQL
+NEW = 'new'          # definitely never seen by this process
+
+
+def _key_bytes(key):
+    return key if isinstance(key, bytes) else str(key).encode('utf-8')
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over a 128-bit blake2b digest"""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(_key_bytes(key), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key):
+        """Add a key; returns True if it was (probably) already present"""
+        present = True
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                present = False
+                self.bits[byte] |= 1 << bit
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, key):
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                return False
+        return True
+
+    def estimated_fpr(self):
+        """False-positive rate implied by the current number of keys"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class ScalableBloomFilter:
+    """
+    Bloom filter that grows by adding stages (Almeida et al.): each stage doubles
+    capacity and tightens its error rate so the compound rate stays near error_rate.
+    """
+
+    GROWTH = 2
+    TIGHTENING = 0.85
+
+    def __init__(self, initial_capacity=1_000_000, error_rate=0.001):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        # First stage gets error_rate * (1 - r) so the geometric series sums to error_rate
+        self.stages = [BloomFilter(initial_capacity, error_rate * (1 - self.TIGHTENING))]
+
+    def __contains__(self, key):
+        return any(key in stage for stage in self.stages)
+
+    def add(self, key):
+        if key in self:
+            return True
+        stage = self.stages[-1]
+        if stage.count >= stage.capacity:
+            stage = BloomFilter(stage.capacity * self.GROWTH, stage.error_rate * self.TIGHTENING)
+            self.stages.append(stage)
+        stage.add(key)
+        return False
+
+    def __len__(self):
+        return sum(stage.count for stage in self.stages)
+
+    def estimated_fpr(self):
+        clean = 1.0
+        for stage in self.stages:
+            clean *= 1 - stage.estimated_fpr()
+        return 1 - clean
+
+    def size_bytes(self):
+        return sum(len(stage.bits) for stage in self.stages)
+
+
+class SeenUrlFilter:
+    """
+    In-process dedupe layer in front of crawled_url.
+
+    Hot hashes live in an exact LRU map (url_hash -> crawl_id), so repeated links resolve
+    without any SQL. Everything ever seen also goes into a scalable Bloom filter; a Bloom
+    miss proves a URL is new, a Bloom hit outside the LRU is resolved by the database.
+    """
+
+    def __init__(self, exact_capacity=200_000, bloom_capacity=1_000_000, error_rate=0.001):
+        self.exact_capacity = exact_capacity
+        self.exact = OrderedDict()
+        self.bloom = ScalableBloomFilter(bloom_capacity, error_rate)
+
+        self.lookups = 0
+        self.exact_hits = 0
+        self.bloom_hits = 0
+        self.misses = 0
+        self.false_positives = 0
+
+    def add(self, url_hash, crawl_id=None):
+        exact = self.exact
+        if url_hash in exact:
+            exact.move_to_end(url_hash)
+            if crawl_id is not None:
+                exact[url_hash] = crawl_id
+        else:
+            exact[url_hash] = crawl_id
+            if len(exact) > self.exact_capacity:
+                exact.popitem(last=False)
+        self.bloom.add(url_hash)
+
+    def lookup(self, url_hash):
+        """Return (KNOWN, crawl_id), (MAYBE, None) or (NEW, None)"""
+        self.lookups += 1
+        crawl_id = self.exact.get(url_hash)
+        if crawl_id is not None:
+            self.exact.move_to_end(url_hash)
+            self.exact_hits += 1
+            return KNOWN, crawl_id
+        if url_hash in self.bloom:
+            self.bloom_hits += 1
+            return MAYBE, None
+        self.misses += 1
+        return NEW, None
+
+    def record_false_positive(self, count=1):
+        """Called when the database shows a MAYBE hash did not exist after all"""
+        self.false_positives += count
+
+    def stats(self):
+        lookups = self.lookups or 1
+        return {
+            'lookups': self.lookups,
+            'hit_rate': self.exact_hits / lookups,
+            'bloom_hit_rate': self.bloom_hits / lookups,
+            'miss_rate': self.misses / lookups,
+            'observed_fpr': self.false_positives / self.bloom_hits if self.bloom_hits else 0.0,
+            'estimated_fpr': self.bloom.estimated_fpr(),
+            'exact_size': len(self.exact),
+            'bloom_size': len(self.bloom),
+            'bloom_bytes': self.bloom.size_bytes(),
+        }
+
+    def log_metrics(self):
+        stats = self.stats()
+        logger.info(
+            f"Seen filter: lookups={stats['lookups']} hit_rate={stats['hit_rate']:.1%} "
+            f"bloom_hit_rate={stats['bloom_hit_rate']:.1%} miss_rate={stats['miss_rate']:.1%} "
+            f"observed_fpr={stats['observed_fpr']:.4%} estimated_fpr={stats['estimated_fpr']:.4%} "
+            f"exact={stats['exact_size']} bloom={stats['bloom_size']} ({stats['bloom_bytes'] / 1e6:.1f} MB)"
+        )
+
+
+async def warm_seen_filter(conn, seen_filter):
+    """Load every url_hash already in crawled_url so the filter is authoritative from the first page"""
+    started = time.perf_counter()
+    rows = 0
+    async for url_hash, crawl_id in iter_url_hashes(conn):
+        seen_filter.add(url_hash, crawl_id)
+        rows += 1
+    logger.info(f"Seen filter warmed with {rows} URLs in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,90 @@
+from database.identity import format_id
+from database.table.site_profile import fetch_site_profile, upsert_site_profile
+from status.logger import logger
+
+
+# Pages rendered with the known strategy before every candidate is probed again
+REPROBE_EVERY = 25
+
+PROFILE_FIELDS = ('load_more_selector', 'pagination_mode', 'pagination_selector', 'scroll_mode', 'pages_since_probe')
+
+
+class SiteProfile:
+    """
+    What worked on one domain's pages: the load-more selector ('' when the site has none),
+    the pagination mode ('clickable', 'url' or 'none') and clickable selector, and the
+    scroll mode ('infinite' or 'static'). None means not learned yet.
+
+    A browser probes every candidate while the profile is incomplete, after the known
+    strategy stopped working, and every reprobe_every pages; otherwise it goes straight
+    to the known strategy. Workers of one domain share the profile.
+    """
+
+    def __init__(self, domain_id, row=None, reprobe_every=REPROBE_EVERY):
+        self.domain_id = domain_id
+        self.reprobe_every = reprobe_every
+        row = row or {}
+        self.load_more_selector = row.get('load_more_selector')
+        self.pagination_mode = row.get('pagination_mode')
+        self.pagination_selector = row.get('pagination_selector')
+        self.scroll_mode = row.get('scroll_mode')
+        self.pages_since_probe = row.get('pages_since_probe') or 0
+        # Set when the known strategy failed, so the next page probes again
+        self.stale = False
+        # Changed since it was last saved
+        self.dirty = False
+
+    @property
+    def complete(self):
+        return None not in (self.load_more_selector, self.pagination_mode, self.scroll_mode)
+
+    def start_page(self):
+        """Count one rendered page; True if this page should probe every candidate"""
+        if self.stale or not self.complete or self.pages_since_probe >= self.reprobe_every:
+            self.pages_since_probe = 0
+            self.stale = False
+            self.dirty = True
+            return True
+        self.pages_since_probe += 1
+        return False
+
+    def learn(self, **observed):
+        for name, value in observed.items():
+            if getattr(self, name) != value:
+                logger.info(f"Site profile {format_id('domain', self.domain_id)}: {name} = {value!r}")
+                setattr(self, name, value)
+                self.dirty = True
+
+    def invalidate(self, reason):
+        """The known strategy did not work on this page; probe again on the next one"""
+        logger.info(f"Site profile {format_id('domain', self.domain_id)} is stale: {reason}")
+        self.stale = True
+
+    def as_row(self):
+        return {name: getattr(self, name) for name in PROFILE_FIELDS}
+
+
+class SiteProfileStore:
+    """Site profiles of the domains this process crawls, loaded on first use and saved when they change"""
+
+    def __init__(self, reprobe_every=REPROBE_EVERY):
+        self.reprobe_every = reprobe_every
+        self._profiles = {}
+
+    async def get(self, conn, domain_id):
+        profile = self._profiles.get(domain_id)
+        if profile is None:
+            row = await fetch_site_profile(conn, domain_id)
+            # Another worker of the same domain may have loaded it meanwhile
+            profile = self._profiles.setdefault(domain_id, SiteProfile(domain_id, row, self.reprobe_every))
+        return profile
+
+    async def save(self, conn, profile):
+        if not profile.dirty:
+            return
+        profile.dirty = False
+        if not await upsert_site_profile(conn, profile.domain_id, profile.as_row()):
+            profile.dirty = True
+
+    def forget(self, domain_id):
+        self._profiles.pop(domain_id, None)
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+from database.setup import get_connection, return_connection
+from database.table.crawled_url import bulk_update_crawled_url_status, bulk_update_revisit_state, bulk_update_yield_curves
+from database.table.seed_domain import bulk_update_seed_domains
+from status.logger import logger
+
+
+class WriteBehindBuffer:
+    """
+    Coalesces crawled_url status, revisit-state and yield-curve changes (by crawl_id) and seed_domain depth/status
+    changes (by domain_id) in memory and writes them back with one batched UPDATE per
+    table and a single commit. A flush happens when max_pending changes are waiting,
+    every flush_interval seconds, and on close(). Like the Frontier it holds its own
+    pooled connection.
+
+    Buffered changes are lost if the process dies; the affected rows stay
+    'in_progress' until their lease expires and the frontier's reaper requeues them.
+    """
+
+    def __init__(self, max_pending=500, flush_interval=2.0):
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+
+        # crawl_id -> (status, crawled_at); later changes overwrite earlier ones
+        self._urls = {}
+        # crawl_id -> (etag, last_modified, link_digest, revisit_seconds)
+        self._revisits = {}
+        # crawl_id -> yield curve as JSON text
+        self._yields = {}
+        # domain_id -> [current_depth, status, completed_at]
+        self._domains = {}
+        self._lock = asyncio.Lock()
+        self._conn = None
+        self._flush_task = None
+        self._size_flush = None
+        # Set by close(); the flush loop finishes its current flush and exits instead of being cancelled
+        self._closing = asyncio.Event()
+
+        self.stats = {'changes': 0, 'rows': 0, 'flushes': 0, 'size_flushes': 0}
+
+    async def open(self):
+        self._conn = await get_connection()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    def _pending(self):
+        return len(self._urls) + len(self._revisits) + len(self._yields) + len(self._domains)
+
+    def _changed(self):
+        self.stats['changes'] += 1
+        if self._pending() >= self.max_pending:
+            if self._size_flush is None or self._size_flush.done():
+                self.stats['size_flushes'] += 1
+                self._size_flush = asyncio.create_task(self.flush())
+
+    def set_url_status(self, crawl_id, status):
+        self._urls[crawl_id] = (status, datetime.now())
+        self._changed()
+
+    def set_revisit_state(self, crawl_id, etag, last_modified, link_digest, revisit_seconds):
+        self._revisits[crawl_id] = (etag, last_modified, link_digest, revisit_seconds)
+        self._changed()
+
+    def set_yield_curve(self, crawl_id, yield_curve):
+        self._yields[crawl_id] = json.dumps(yield_curve)
+        self._changed()
+
+    def set_domain_depth(self, domain_id, depth):
+        self._domains.setdefault(domain_id, [None, None, None])[0] = depth
+        self._changed()
+
+    async def complete_domain(self, domain_id):
+        """Mark a domain completed and flush at once, so no worker picks it up again"""
+        entry = self._domains.setdefault(domain_id, [None, None, None])
+        entry[1] = 'completed'
+        entry[2] = datetime.now()
+        self.stats['changes'] += 1
+        await self.flush()
+
+    async def flush(self):
+        """Write every pending change in one transaction"""
+        async with self._lock:
+            if not self._pending():
+                return
+            urls, self._urls = self._urls, {}
+            revisits, self._revisits = self._revisits, {}
+            yields, self._yields = self._yields, {}
+            domains, self._domains = self._domains, {}
+            started = time.perf_counter()
+            try:
+                # The UPDATEs and the COMMIT go out in a single round trip
+                async with self._conn.pipeline():
+                    await bulk_update_crawled_url_status(
+                        self._conn, [(crawl_id, status, at) for crawl_id, (status, at) in urls.items()]
+                    )
+                    await bulk_update_revisit_state(
+                        self._conn, [(crawl_id, *state) for crawl_id, state in revisits.items()]
+                    )
+                    await bulk_update_yield_curves(self._conn, list(yields.items()))
+                    await bulk_update_seed_domains(
+                        self._conn, [(domain_id, *entry) for domain_id, entry in domains.items()]
+                    )
+                    await self._conn.commit()
+            except BaseException as e:
+                # Keep the changes for the next flush unless newer ones replaced them, also when
+                # the flush itself was cancelled
+                for crawl_id, change in urls.items():
+                    self._urls.setdefault(crawl_id, change)
+                for crawl_id, state in revisits.items():
+                    self._revisits.setdefault(crawl_id, state)
+                for crawl_id, curve in yields.items():
+                    self._yields.setdefault(crawl_id, curve)
+                for domain_id, entry in domains.items():
+                    self._domains.setdefault(domain_id, entry)
+                await self._conn.rollback()
+                if not isinstance(e, Exception):
+                    raise
+                logger.error(f"Error flushing buffered writes: {e}")
+                return
+            self.stats['rows'] += len(urls) + len(revisits) + len(yields) + len(domains)
+            self.stats['flushes'] += 1
+            logger.debug(f"Flushed {len(urls)} URL and {len(domains)} domain changes in {time.perf_counter() - started:.3f}s")
+
+    async def _flush_loop(self):
+        while not self._closing.is_set():
+            try:
+                await asyncio.wait_for(self._closing.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                await self.flush()
+
+    def log_metrics(self):
+        logger.info(
+            f"Write buffer: changes={self.stats['changes']} rows={self.stats['rows']} "
+            f"flushes={self.stats['flushes']} size_flushes={self.stats['size_flushes']} "
+            f"pending={self._pending()}"
+        )
+
+    async def close(self):
+        if self._conn is None:
+            return
+        try:
+            # Let a flush in progress finish rather than cancel it halfway through its pipeline
+            self._closing.set()
+            if self._flush_task is not None:
+                await self._flush_task
+            if self._size_flush is not None:
+                await self._size_flush
+            await self.flush()
+        finally:
+            self.log_metrics()
+            await return_connection(self._conn)
+            self._conn = None
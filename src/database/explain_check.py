@@ -0,0 +1,153 @@
+"""
+EXPLAIN regression check for the crawler's hot queries.
+
+Run from src/ against a migrated database:  python -m database.explain_check
+Each query is planned with sequential scans disabled, so a Seq Scan that still shows up
+means no index can serve the query at all. Exits with status 1 if any hot query
+falls back to a sequential scan on crawled_url or url_relationship.
+"""
+import asyncio
+import json
+import sys
+from database.setup import get_connection, return_connection, close_all_connections
+from database.migrations import run_migrations
+
+
+WATCHED_TABLES = {'crawled_url', 'url_relationship'}
+
+SAMPLE_HASH = bytes(20)
+
+# (name, sql, params) - mirrors the statements in database/table and crawler/crawler.py
+HOT_QUERIES = [
+    ("frontier claim", """
+        SELECT crawl_id FROM crawled_url
+        WHERE domain_id = %s AND crawl_status = 'not_visited'
+        ORDER BY discovered_at_depth ASC, discovered_at ASC
+        LIMIT 200
+        FOR UPDATE SKIP LOCKED
+    """, (1,)),
+    ("bulk status update", """
+        UPDATE crawled_url c
+        SET crawl_status = u.crawl_status, crawled_at = u.crawled_at,
+            claimed_by = NULL, lease_expires_at = NULL
+        FROM unnest(%s::bigint[], %s::text[], %s::timestamp[]) AS u(crawl_id, crawl_status, crawled_at)
+        WHERE c.crawl_id = u.crawl_id
+    """, ([1], ['visited'], [None])),
+    ("child upsert", """
+        WITH incoming AS (
+            SELECT * FROM unnest(%s::text[], %s::bytea[], %s::text[]) AS u(url_path, url_hash, url_content)
+        ),
+        inserted AS (
+            INSERT INTO crawled_url (domain_id, url_path, url_hash, discovered_at_depth, crawl_status, url_content, discovered_at, crawled_at)
+            SELECT %s, i.url_path, i.url_hash, %s, 'not_visited', i.url_content, NOW(), NULL
+            FROM incoming i
+            ON CONFLICT (url_hash) DO NOTHING
+            RETURNING url_hash, crawl_id
+        )
+        SELECT url_hash, crawl_id, TRUE FROM inserted
+        UNION ALL
+        SELECT c.url_hash, c.crawl_id, FALSE
+        FROM incoming i
+        JOIN crawled_url c ON c.url_hash = i.url_hash
+    """, (['https://example.com/'], [SAMPLE_HASH], ['example'], 1, 1)),
+    ("edge insert", """
+        INSERT INTO url_relationship (domain_id, parent_url_id, child_url_id, parent_depth, child_depth, parent_link_text, discovered_at)
+        SELECT %s, %s, child_url_id, %s, %s, %s, %s
+        FROM unnest(%s::bigint[]) AS child_url_id
+        ON CONFLICT ON CONSTRAINT unique_parent_child DO NOTHING
+    """, (1, 1, 0, 1, 'example', None, [2, 3])),
+    ("revisit state update", """
+        UPDATE crawled_url c
+        SET etag = u.etag, last_modified = u.last_modified, link_digest = u.link_digest,
+            revisit_seconds = u.revisit_seconds,
+            next_visit_at = NOW() + make_interval(secs => u.revisit_seconds)
+        FROM unnest(%s::bigint[], %s::text[], %s::text[], %s::bytea[], %s::integer[])
+            AS u(crawl_id, etag, last_modified, link_digest, revisit_seconds)
+        WHERE c.crawl_id = u.crawl_id
+    """, ([1], [None], [None], [SAMPLE_HASH], [3600])),
+    ("lease heartbeat", """
+        UPDATE crawled_url SET lease_expires_at = NOW() + make_interval(secs => 120)
+        WHERE claimed_by = %s AND crawl_status IN ('queued', 'in_progress')
+    """, ('host:1',)),
+    ("lease reaper", """
+        UPDATE crawled_url SET crawl_status = 'not_visited', claimed_by = NULL, lease_expires_at = NULL
+        WHERE crawl_status IN ('queued', 'in_progress')
+          AND (lease_expires_at IS NULL OR lease_expires_at < NOW())
+    """, ()),
+    ("due revisits", """
+        SELECT crawl_id FROM crawled_url
+        WHERE crawl_status = 'visited' AND next_visit_at <= NOW()
+    """, ()),
+    ("crawl ids by hash", """
+        SELECT url_hash, crawl_id FROM crawled_url WHERE url_hash = ANY(%s)
+    """, ([SAMPLE_HASH],)),
+    ("mark started", """
+        UPDATE crawled_url SET crawl_status = 'in_progress', crawled_at = NOW()
+        WHERE crawl_id = ANY(%s) AND crawl_status = 'queued'
+    """, ([1, 2, 3],)),
+    ("edges of a parent", """
+        SELECT child_url_id FROM url_relationship WHERE parent_url_id = %s
+    """, (1,)),
+    ("relationship join", """
+        SELECT p_url.url_path, c_url.url_path
+        FROM url_relationship ur
+        JOIN crawled_url p_url ON ur.parent_url_id = p_url.crawl_id
+        JOIN crawled_url c_url ON ur.child_url_id = c_url.crawl_id
+        WHERE ur.child_url_id = %s
+    """, (1,)),
+]
+
+
+def seq_scans(plan):
+    """Tables read with a Seq Scan anywhere in an EXPLAIN (FORMAT JSON) plan tree"""
+    found = []
+    if plan.get('Node Type') == 'Seq Scan' and plan.get('Relation Name') in WATCHED_TABLES:
+        found.append(plan['Relation Name'])
+    for child in plan.get('Plans', []):
+        found.extend(seq_scans(child))
+    return found
+
+
+def index_names(plan):
+    names = [plan['Index Name']] if 'Index Name' in plan else []
+    for child in plan.get('Plans', []):
+        names.extend(index_names(child))
+    return names
+
+
+async def check_plans(conn):
+    """Return the names of hot queries that would sequentially scan a watched table"""
+    failures = []
+    async with conn.cursor() as cursor:
+        await cursor.execute("SET enable_seqscan = off")
+        for name, sql, params in HOT_QUERIES:
+            await cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            raw = (await cursor.fetchone())[0]
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]['Plan']
+            scanned = seq_scans(plan)
+            if scanned:
+                failures.append(name)
+                print(f"FAIL  {name}: sequential scan on {', '.join(sorted(set(scanned)))}")
+            else:
+                print(f"ok    {name}: {', '.join(index_names(plan)) or 'no index needed'}")
+        await cursor.execute("RESET enable_seqscan")
+    await conn.rollback()
+    return failures
+
+
+async def main():
+    conn = await get_connection()
+    try:
+        await run_migrations(conn)
+        failures = await check_plans(conn)
+    finally:
+        await return_connection(conn)
+        await close_all_connections()
+    if failures:
+        print(f"{len(failures)} hot queries fall back to sequential scans")
+        sys.exit(1)
+    print("All hot queries use an index")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
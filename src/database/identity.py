@@ -0,0 +1,70 @@
+# Keys are BIGINT identities in the database; the old 'domain12' / 'crawl34' / 'link56'
+# spellings are only produced for people (logs, reports, scripts like test.py).
+
+
+def format_id(kind, key):
+    """Text form of an integer key, e.g. format_id('crawl', 34) -> 'crawl34'"""
+    return None if key is None else f"{kind}{key}"
+
+
+def parse_id(kind, text):
+    """Integer key from either form, e.g. parse_id('domain', 'domain154') -> 154"""
+    if text is None or isinstance(text, int):
+        return text
+    return int(text[len(kind):] if text.startswith(kind) else text)
+
+
+# Converts TEXT keys ('domain' || n, 'crawl' || n, 'link' || n) from older versions to BIGINT
+# identity columns, keeping every number. Applied once by database.migrations.
+INTEGER_KEYS_MIGRATION = """
+DO $$
+BEGIN
+    IF (SELECT data_type FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'crawled_url' AND column_name = 'crawl_id') = 'text' THEN
+
+        ALTER TABLE url_relationship
+            DROP CONSTRAINT IF EXISTS url_relationship_domain_id_fkey,
+            DROP CONSTRAINT IF EXISTS url_relationship_parent_url_id_fkey,
+            DROP CONSTRAINT IF EXISTS url_relationship_child_url_id_fkey;
+        ALTER TABLE crawled_url DROP CONSTRAINT IF EXISTS crawled_url_domain_id_fkey;
+
+        ALTER TABLE seed_domain
+            ALTER COLUMN domain_id DROP DEFAULT,
+            ALTER COLUMN domain_id TYPE BIGINT USING substring(domain_id FROM 7)::BIGINT;
+        ALTER TABLE crawled_url
+            ALTER COLUMN crawl_id DROP DEFAULT,
+            ALTER COLUMN crawl_id TYPE BIGINT USING substring(crawl_id FROM 6)::BIGINT,
+            ALTER COLUMN domain_id TYPE BIGINT USING substring(domain_id FROM 7)::BIGINT;
+        ALTER TABLE url_relationship
+            ALTER COLUMN link_id DROP DEFAULT,
+            ALTER COLUMN link_id TYPE BIGINT USING substring(link_id FROM 5)::BIGINT,
+            ALTER COLUMN domain_id TYPE BIGINT USING substring(domain_id FROM 7)::BIGINT,
+            ALTER COLUMN parent_url_id TYPE BIGINT USING substring(parent_url_id FROM 6)::BIGINT,
+            ALTER COLUMN child_url_id TYPE BIGINT USING substring(child_url_id FROM 6)::BIGINT;
+
+        DROP SEQUENCE IF EXISTS domain_id_seq, crawl_id_seq, link_id_seq;
+
+        ALTER TABLE seed_domain ALTER COLUMN domain_id ADD GENERATED BY DEFAULT AS IDENTITY;
+        ALTER TABLE crawled_url ALTER COLUMN crawl_id ADD GENERATED BY DEFAULT AS IDENTITY;
+        ALTER TABLE url_relationship ALTER COLUMN link_id ADD GENERATED BY DEFAULT AS IDENTITY;
+
+        -- One-off scans so the identities continue after the migrated numbers
+        PERFORM setval(pg_get_serial_sequence('seed_domain', 'domain_id'),
+                       COALESCE((SELECT MAX(domain_id) FROM seed_domain), 0) + 1, false);
+        PERFORM setval(pg_get_serial_sequence('crawled_url', 'crawl_id'),
+                       COALESCE((SELECT MAX(crawl_id) FROM crawled_url), 0) + 1, false);
+        PERFORM setval(pg_get_serial_sequence('url_relationship', 'link_id'),
+                       COALESCE((SELECT MAX(link_id) FROM url_relationship), 0) + 1, false);
+
+        ALTER TABLE crawled_url
+            ADD FOREIGN KEY (domain_id) REFERENCES seed_domain(domain_id) ON DELETE CASCADE;
+        ALTER TABLE url_relationship
+            ADD FOREIGN KEY (domain_id) REFERENCES seed_domain(domain_id) ON DELETE CASCADE,
+            ADD FOREIGN KEY (parent_url_id) REFERENCES crawled_url(crawl_id) ON DELETE CASCADE,
+            ADD FOREIGN KEY (child_url_id) REFERENCES crawled_url(crawl_id) ON DELETE CASCADE;
+
+        RAISE NOTICE 'Migrated crawler keys from TEXT to BIGINT';
+    END IF;
+END $$;
+"""
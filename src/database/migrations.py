@@ -0,0 +1,151 @@
+import time
+from database.table.seed_domain import SEED_DOMAIN_SCHEMA
+from database.table.crawled_url import CRAWLED_URL_SCHEMA
+from database.table.url_relationship import URL_RELATIONSHIP_SCHEMA
+from database.table.site_profile import SITE_PROFILE_SCHEMA
+from database.identity import INTEGER_KEYS_MIGRATION
+from status.logger import logger
+
+
+# Indexes for the crawler's real access paths (see database/explain_check.py):
+# - frontier claims read one domain's unvisited rows in depth order, which a partial index
+#   over the small not-yet-visited slice serves without touching the visited bulk
+# - status lookups and updates go through url_hash; INCLUDE makes the lookups index-only
+# - the low-selectivity crawl_status index, its wider composite, and edge indexes no query
+#   uses (or that the unique constraint already covers) only slow down inserts
+# Migrations 2 and 3 no longer create the dropped indexes, so on a new database the drops
+# are no-ops; they only clean up databases created before.
+ACCESS_PATH_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_crawl_frontier
+    ON crawled_url (domain_id, crawl_status, discovered_at_depth, discovered_at)
+    WHERE crawl_status IN ('not_visited', 'queued', 'in_progress');
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_url_hash_covering
+    ON crawled_url (url_hash) INCLUDE (crawl_id, crawl_status);
+DROP INDEX IF EXISTS idx_url_hash_unique;
+
+DROP INDEX IF EXISTS idx_crawl_status;
+DROP INDEX IF EXISTS idx_domain_status_depth;
+
+DROP INDEX IF EXISTS idx_parent_url;
+DROP INDEX IF EXISTS idx_parent_depth;
+DROP INDEX IF EXISTS idx_child_depth;
+
+ANALYZE crawled_url;
+ANALYZE url_relationship;
+"""
+
+# Claims become leases: the owning process renews lease_expires_at while it works, and rows
+# whose lease ran out are requeued. The partial index serves both the heartbeat (by owner)
+# and the reaper (by expiry) over just the claimed slice of crawled_url.
+CLAIM_LEASES = """
+ALTER TABLE crawled_url
+    ADD COLUMN IF NOT EXISTS claimed_by TEXT,
+    ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP;
+ALTER TABLE seed_domain
+    ADD COLUMN IF NOT EXISTS claimed_by TEXT,
+    ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP;
+
+CREATE INDEX IF NOT EXISTS idx_crawl_leases
+    ON crawled_url (claimed_by, lease_expires_at)
+    WHERE crawl_status IN ('queued', 'in_progress');
+"""
+
+# Incremental re-crawl: HTTP validators and a digest of the extracted link set per URL, and
+# an adaptive interval after which visited listing pages are put back into the frontier
+REVISIT_STATE = """
+ALTER TABLE crawled_url
+    ADD COLUMN IF NOT EXISTS etag TEXT,
+    ADD COLUMN IF NOT EXISTS last_modified TEXT,
+    ADD COLUMN IF NOT EXISTS link_digest BYTEA,
+    ADD COLUMN IF NOT EXISTS revisit_seconds INTEGER,
+    ADD COLUMN IF NOT EXISTS next_visit_at TIMESTAMP;
+
+CREATE INDEX IF NOT EXISTS idx_crawl_next_visit
+    ON crawled_url (next_visit_at)
+    WHERE crawl_status = 'visited' AND next_visit_at IS NOT NULL;
+"""
+
+# New same-domain links per scroll and per pagination page of each rendered URL, and why each
+# sequence stopped, kept so the yield-based stopping thresholds can be tuned offline
+YIELD_CURVES = """
+ALTER TABLE crawled_url
+    ADD COLUMN IF NOT EXISTS yield_curve JSONB;
+"""
+
+# Arbitrary key for pg_advisory_xact_lock so concurrent starts apply migrations one at a time
+MIGRATION_LOCK_ID = 4_812_203_117
+
+# (version, description, sql) - append only; never edit a migration that has shipped beyond
+# what a later migration already converges (as with the indexes 5 replaces).
+# Versions 1-4 are written to be no-ops on databases created before schema_version existed.
+MIGRATIONS = [
+    (1, "seed_domain table", SEED_DOMAIN_SCHEMA),
+    (2, "crawled_url table", CRAWLED_URL_SCHEMA),
+    (3, "url_relationship table", URL_RELATIONSHIP_SCHEMA),
+    (4, "BIGINT identity keys", INTEGER_KEYS_MIGRATION),
+    (5, "access path indexes", ACCESS_PATH_INDEXES),
+    (6, "claim leases", CLAIM_LEASES),
+    (7, "revisit state", REVISIT_STATE),
+    (8, "site_profile table", SITE_PROFILE_SCHEMA),
+    (9, "yield curves", YIELD_CURVES),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+async def get_schema_version(conn):
+    """Highest applied migration, 0 for a database that has none"""
+    async with conn.cursor() as cursor:
+        await cursor.execute("SELECT to_regclass('schema_version') IS NOT NULL")
+        exists = (await cursor.fetchone())[0]
+        if not exists:
+            return 0
+        await cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        return (await cursor.fetchone())[0]
+
+
+async def run_migrations(conn):
+    """
+    Apply pending migrations, each exactly once and in its own transaction.
+    An up-to-date database costs one catalog lookup and one index read, without taking any lock.
+    """
+    started = time.perf_counter()
+    current = await get_schema_version(conn)
+    await conn.commit()
+    if current >= LATEST_VERSION:
+        logger.info(f"Schema is at version {current}, nothing to migrate ({time.perf_counter() - started:.3f}s)")
+        return current
+
+    for version, description, sql in MIGRATIONS:
+        if version <= current:
+            continue
+        try:
+            async with conn.cursor() as cursor:
+                # Serialize with other starting workers, then re-check under the lock
+                await cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+                await cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        version INTEGER PRIMARY KEY,
+                        description TEXT NOT NULL,
+                        applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+                    )
+                """)
+                await cursor.execute("SELECT 1 FROM schema_version WHERE version = %s", (version,))
+                if await cursor.fetchone() is None:
+                    step_started = time.perf_counter()
+                    await cursor.execute(sql)
+                    await cursor.execute(
+                        "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                        (version, description),
+                    )
+                    logger.info(f"Applied migration {version} ({description}) in {time.perf_counter() - step_started:.2f}s")
+            await conn.commit()
+            current = version
+        except Exception as e:
+            await conn.rollback()
+            logger.error(f"Error applying migration {version} ({description}): {e}")
+            raise
+
+    logger.info(f"Schema migrated to version {current} in {time.perf_counter() - started:.2f}s")
+    return current
@@ -27,18 +27,28 @@ DB_CONFIG = {
     "port": os.getenv("DB_PORT"),
 }
 
+# Statements run this many times on a connection are prepared server-side automatically;
+# the hot statements in database/table pass prepare=True and are prepared on first use
+PREPARE_THRESHOLD = int(os.getenv("DB_PREPARE_THRESHOLD", "2"))
+
 # Initialize connection pool variable
 connection_pool = None
 
-async def initialize_pool():
-    """Initialize the async connection pool."""
+async def initialize_pool(min_size=3, max_size=10):
+    """Initialize the async connection pool.
+
+    max_size must cover one connection per concurrent crawl worker.
+    """
     global connection_pool
+    if connection_pool is not None:
+        return
     try:
         # Create the pool but don't connect yet
         connection_pool = AsyncConnectionPool(
             conninfo=" ".join(f"{k}={v}" for k, v in DB_CONFIG.items()),
-            min_size=3,
-            max_size=10,
+            min_size=min_size,
+            max_size=max_size,
+            kwargs={"prepare_threshold": PREPARE_THRESHOLD},
             open=False  # Don't open connections in constructor
         )
         
@@ -63,8 +73,10 @@ async def return_connection(conn):
 
 async def close_all_connections():
     """Close all connections in the async pool (call this at app exit)."""
+    global connection_pool
     if connection_pool:
         await connection_pool.close()
+        connection_pool = None
         logger.info("All database connections closed")
 
 
@@ -1,145 +1,426 @@
 from status.logger import logger
 import datetime
 
-async def create_crawled_url_table(conn):
-    """Create table with url_id as primary key and url_path as unique constraint"""
+# crawled_url table, the one-off url_hash conversion of older tables, and its indexes
+CRAWLED_URL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawled_url (
+    crawl_id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    domain_id BIGINT NOT NULL,
+    url_path TEXT NOT NULL,
+    url_hash BYTEA NOT NULL,
+    discovered_at_depth INTEGER NOT NULL,
+    crawl_status TEXT NOT NULL DEFAULT 'not_visited',
+    url_content VARCHAR(100),
+    discovered_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    crawled_at TIMESTAMP,
+    FOREIGN KEY (domain_id) REFERENCES seed_domain(domain_id) ON DELETE CASCADE
+);
+
+-- Tables from before url_hash became a unique 20-byte SHA-1: fold duplicate rows
+-- into the oldest row per hash, then convert the hex text to bytea
+DO $$
+BEGIN
+    IF (SELECT data_type FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'crawled_url' AND column_name = 'url_hash') <> 'bytea' THEN
+
+        CREATE TEMP TABLE url_hash_duplicates ON COMMIT DROP AS
+        SELECT crawl_id, keeper FROM (
+            SELECT crawl_id, first_value(crawl_id) OVER (
+                PARTITION BY url_hash ORDER BY discovered_at, crawl_id
+            ) AS keeper
+            FROM crawled_url
+        ) ranked
+        WHERE crawl_id <> keeper;
+
+        -- A URL visited through any of its duplicate rows counts as visited
+        UPDATE crawled_url
+        SET crawl_status = 'visited'
+        WHERE crawl_id IN (
+            SELECT d.keeper FROM url_hash_duplicates d
+            JOIN crawled_url c ON c.crawl_id = d.crawl_id
+            WHERE c.crawl_status = 'visited'
+        );
+
+        -- Re-point edges at the surviving rows; deleting the duplicates cascades the old edges
+        INSERT INTO url_relationship (link_id, domain_id, parent_url_id, child_url_id, parent_depth, child_depth, parent_link_text, discovered_at)
+        SELECT 'link' || nextval('link_id_seq'), r.domain_id,
+               COALESCE(p.keeper, r.parent_url_id), COALESCE(c.keeper, r.child_url_id),
+               r.parent_depth, r.child_depth, r.parent_link_text, r.discovered_at
+        FROM url_relationship r
+        LEFT JOIN url_hash_duplicates p ON p.crawl_id = r.parent_url_id
+        LEFT JOIN url_hash_duplicates c ON c.crawl_id = r.child_url_id
+        WHERE p.crawl_id IS NOT NULL OR c.crawl_id IS NOT NULL
+        ON CONFLICT ON CONSTRAINT unique_parent_child DO NOTHING;
+
+        DELETE FROM crawled_url WHERE crawl_id IN (SELECT crawl_id FROM url_hash_duplicates);
+
+        DROP INDEX IF EXISTS idx_url_hash;
+        ALTER TABLE crawled_url ALTER COLUMN url_hash TYPE BYTEA USING decode(url_hash, 'hex');
+    END IF;
+END $$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_url_hash_covering ON crawled_url(url_hash) INCLUDE (crawl_id, crawl_status);
+CREATE INDEX IF NOT EXISTS idx_domain_depth ON crawled_url(domain_id, discovered_at_depth);
+"""
+
+
+async def insert_into_crawled_url_table(conn, domain_id, url_path, url_hash, discovered_at_depth, url_content, crawled_at):
+    """
+    Insert one URL unless its hash is already stored.
+    Does not commit - the caller owns the transaction.
+    Returns (crawl_id of the stored row, True if this call inserted it).
+    """
+    async with conn.cursor() as cursor:
+        await cursor.execute("""
+            WITH inserted AS (
+                INSERT INTO crawled_url (domain_id, url_path, url_hash, discovered_at_depth, crawl_status, url_content, discovered_at, crawled_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (url_hash) DO NOTHING
+                RETURNING crawl_id
+            )
+            SELECT crawl_id, TRUE FROM inserted
+            UNION ALL
+            SELECT crawl_id, FALSE FROM crawled_url WHERE url_hash = %s
+            LIMIT 1
+        """, (domain_id, url_path, url_hash, discovered_at_depth, 'not_visited', url_content, datetime.datetime.now(), crawled_at, url_hash), prepare=True)
+        result = await cursor.fetchone()
+    
+    if result is None:
+        return None, False
+    logger.info(f"Crawled Url:{url_path} info added to the table successfully")
+    return result[0], result[1]
+
+async def bulk_insert_into_crawled_url_table(conn, domain_id, discovered_at_depth, rows):
+    """
+    Upsert a page's child URLs with one statement; rows are (url_path, url_hash, url_content)
+    with url_hash the 20-byte SHA-1. Hashes already stored are left untouched.
+    Does not commit - the caller owns the transaction.
+    Returns ({url_hash: crawl_id} for every row, set of url_hashes inserted by this call).
+    """
+    if not rows:
+        return {}, set()
+    
+    url_paths, url_hashes, url_contents = (list(column) for column in zip(*rows))
+    async with conn.cursor() as cursor:
+        # Newly inserted rows come back from the CTE, already stored ones from the join
+        await cursor.execute("""
+            WITH incoming AS (
+                SELECT * FROM unnest(%s::text[], %s::bytea[], %s::text[]) AS u(url_path, url_hash, url_content)
+            ),
+            inserted AS (
+                INSERT INTO crawled_url (domain_id, url_path, url_hash, discovered_at_depth, crawl_status, url_content, discovered_at, crawled_at)
+                SELECT %s, i.url_path, i.url_hash, %s, 'not_visited', i.url_content, NOW(), NULL
+                FROM incoming i
+                ON CONFLICT (url_hash) DO NOTHING
+                RETURNING url_hash, crawl_id
+            )
+            SELECT url_hash, crawl_id, TRUE FROM inserted
+            UNION ALL
+            SELECT c.url_hash, c.crawl_id, FALSE
+            FROM incoming i
+            JOIN crawled_url c ON c.url_hash = i.url_hash
+        """, (url_paths, url_hashes, url_contents, domain_id, discovered_at_depth), prepare=True)
+        
+        child_ids = {}
+        new_hashes = set()
+        for url_hash, crawl_id, inserted in await cursor.fetchall():
+            child_ids[url_hash] = crawl_id
+            if inserted:
+                new_hashes.add(url_hash)
+    
+    # A row committed by another worker after our snapshot conflicts but is not visible to the join
+    missing = [url_hash for url_hash in url_hashes if url_hash not in child_ids]
+    if missing:
+        child_ids.update(await fetch_crawl_ids_by_hash(conn, missing))
+    
+    return child_ids, new_hashes
+
+async def iter_url_hashes(conn, batch_size=10000):
+    """Stream (url_hash, crawl_id) for every crawled_url row through a server-side cursor"""
+    async with conn.cursor(name='warm_url_hashes') as cursor:
+        cursor.itersize = batch_size
+        await cursor.execute("SELECT url_hash, crawl_id FROM crawled_url")
+        async for row in cursor:
+            yield row
+    await conn.commit()
+
+async def fetch_crawl_ids_by_hash(conn, url_hashes):
+    """Look up crawl_ids for many hashes in one round trip; returns {url_hash: crawl_id}"""
+    if not url_hashes:
+        return {}
+    async with conn.cursor() as cursor:
+        await cursor.execute("""
+            SELECT url_hash, crawl_id
+            FROM crawled_url
+            WHERE url_hash = ANY(%s::bytea[])
+        """, (list(url_hashes),), prepare=True)
+        return {url_hash: crawl_id for url_hash, crawl_id in await cursor.fetchall()}
+
+
+async def claim_crawled_url_batch(conn, domain_id, limit, owner, lease_seconds):
+    """
+    Reserve up to `limit` unvisited rows of a domain for `owner` by marking them 'queued'
+    with a lease; the owner must renew it (renew_url_leases) or the reaper hands the rows back.
+    Rows come with their revisit state (validators, link digest, interval), all NULL until
+    the URL has been visited once.
+    SKIP LOCKED keeps concurrent crawler processes from reserving the same rows.
+    """
+    try:
+        async with conn.pipeline(), conn.cursor() as cursor:
+            await cursor.execute("""
+                UPDATE crawled_url
+                SET crawl_status = 'queued', claimed_by = %s,
+                    lease_expires_at = NOW() + make_interval(secs => %s)
+                WHERE crawl_id IN (
+                    SELECT crawl_id
+                    FROM crawled_url
+                    WHERE domain_id = %s AND crawl_status = 'not_visited'
+                    ORDER BY discovered_at_depth ASC, discovered_at ASC
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING url_path, domain_id, discovered_at_depth, crawl_id, url_content,
+                          etag, last_modified, link_digest, revisit_seconds;
+            """, (owner, lease_seconds, domain_id, limit), prepare=True)
+            await conn.commit()
+            result = await cursor.fetchall()
+        return result
+    except Exception as e:
+        logger.error(f"Error claiming crawled URL batch: {e}")
+        await conn.rollback()
+        return []
+
+async def mark_crawled_urls_started(conn, crawl_ids):
+    """Flip reserved rows to 'in_progress' once a worker actually starts them"""
+    if not crawl_ids:
+        return
+    try:
+        async with conn.pipeline(), conn.cursor() as cursor:
+            await cursor.execute("""
+                UPDATE crawled_url
+                SET crawl_status = 'in_progress', crawled_at = NOW()
+                WHERE crawl_id = ANY(%s::bigint[]) AND crawl_status = 'queued'
+            """, (list(crawl_ids),), prepare=True)
+            await conn.commit()
+    except Exception as e:
+        await conn.rollback()
+        logger.error(f"Error marking crawled URLs as started: {e}")
+
+async def release_crawled_urls(conn, crawl_ids):
+    """Give reserved rows that were never started back to the frontier"""
+    if not crawl_ids:
+        return
+    try:
+        async with conn.pipeline(), conn.cursor() as cursor:
+            await cursor.execute("""
+                UPDATE crawled_url
+                SET crawl_status = 'not_visited', claimed_by = NULL, lease_expires_at = NULL
+                WHERE crawl_id = ANY(%s::bigint[]) AND crawl_status = 'queued'
+            """, (list(crawl_ids),), prepare=True)
+            await conn.commit()
+    except Exception as e:
+        await conn.rollback()
+        logger.error(f"Error releasing crawled URLs: {e}")
+
+async def requeue_in_progress_urls(conn):
+    """Return rows left 'queued' or 'in_progress' by a stopped run to the frontier.
+    Only safe when no other crawler process is running."""
     try:
         async with conn.cursor() as cursor:
             await cursor.execute("""
-                
-            CREATE SEQUENCE IF NOT EXISTS crawl_id_seq START 1;
-
-            CREATE TABLE IF NOT EXISTS crawled_url (
-                crawl_id TEXT PRIMARY KEY DEFAULT 'crawl' || nextval('crawl_id_seq'),
-                domain_id TEXT NOT NULL,
-                url_path TEXT NOT NULL,
-                url_hash VARCHAR(64) NOT NULL,
-                discovered_at_depth INTEGER NOT NULL, 
-                crawl_status TEXT NOT NULL DEFAULT 'not_visited', 
-                url_content VARCHAR(100),
-                discovered_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                crawled_at TIMESTAMP,
-                FOREIGN KEY (domain_id) REFERENCES seed_domain(domain_id) ON DELETE CASCADE
-            );
-
-            ALTER SEQUENCE crawl_id_seq OWNED BY crawled_url.crawl_id;
-
-       
-            SELECT setval('crawl_id_seq', 
-                GREATEST(
-                    COALESCE(
-                        (SELECT MAX(CAST(SUBSTRING(crawl_id FROM 6) AS INTEGER)) 
-                        FROM crawled_url 
-                        WHERE crawl_id ~ '^crawl[0-9]+$'), 
-                        0
-                    ), 
-                    0
-                ) + 1,
-                false
-            );
-
-            CREATE INDEX IF NOT EXISTS idx_url_hash ON crawled_url(url_hash);
-            CREATE INDEX IF NOT EXISTS idx_domain_depth ON crawled_url(domain_id, discovered_at_depth);
-            CREATE INDEX IF NOT EXISTS idx_crawl_status ON crawled_url(crawl_status);
-            CREATE INDEX IF NOT EXISTS idx_domain_status_depth ON crawled_url(domain_id, crawl_status, discovered_at_depth);
-
-                                
+                UPDATE crawled_url
+                SET crawl_status = 'not_visited', claimed_by = NULL, lease_expires_at = NULL
+                WHERE crawl_status IN ('queued', 'in_progress')
             """)
-        
+            requeued = cursor.rowcount
         await conn.commit()
-        logger.info("Crawled-Url Table created successfully with primary key and unique constraints")
+        logger.info(f"Requeued {requeued} in_progress URLs")
     except Exception as e:
         await conn.rollback()
-        logger.error(f"Error creating table: {e}")
-        
+        logger.error(f"Error requeueing in_progress URLs: {e}")
 
-async def insert_into_crawled_url_table(conn, domain_id, url_path, url_hash, discovered_at_depth, url_content, crawled_at):
+async def renew_url_leases(conn, owner, lease_seconds):
+    """Heartbeat: push back the lease of every row `owner` still holds. Returns the rows renewed."""
     try:
-        async with conn.cursor() as cursor:
-            # Explicitly generate the crawl_id by including it in the VALUES clause
+        async with conn.pipeline(), conn.cursor() as cursor:
             await cursor.execute("""
-                INSERT INTO crawled_url (crawl_id, domain_id, url_path, url_hash, discovered_at_depth, crawl_status, url_content, discovered_at, crawled_at)
-                VALUES ('crawl' || nextval('crawl_id_seq'), %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (domain_id, url_path, url_hash, discovered_at_depth, 'not_visited', url_content, datetime.datetime.now(), crawled_at))
-                        
-        await conn.commit()
-        logger.info(f"Crawled Url:{url_path} info added to the table successfully")
-        
+                UPDATE crawled_url
+                SET lease_expires_at = NOW() + make_interval(secs => %s)
+                WHERE claimed_by = %s AND crawl_status IN ('queued', 'in_progress')
+            """, (lease_seconds, owner), prepare=True)
+            await conn.commit()
+        return cursor.rowcount
     except Exception as e:
         await conn.rollback()
-        logger.error(f"Error inserting crawled URL: {e}")
-        raise
+        logger.error(f"Error renewing URL leases: {e}")
+        return 0
 
-async def fetch_crawled_url(conn):
+async def reap_expired_leases(conn):
+    """
+    Hand rows whose lease ran out (a crashed or hung crawler) back to the frontier.
+    Rows without a lease were left by runs from before leases existed and are treated as expired.
+    Safe to run while other crawlers are working. Returns the number of rows requeued.
+    """
     try:
-        async with conn.cursor() as cursor:
-            # Fix: Mark as 'in_progress' when fetching, not just update crawled_at
+        async with conn.pipeline(), conn.cursor() as cursor:
             await cursor.execute("""
                 UPDATE crawled_url
-                SET crawl_status = 'in_progress', crawled_at = NOW()
-                WHERE crawl_id = (
-                    SELECT crawl_id
-                    FROM crawled_url
-                    WHERE crawl_status IN ('not_visited', 'in_progress')
-                    ORDER BY  discovered_at_depth ASC, crawl_id ASC  
-                    LIMIT 1
-                 
-                )
-                RETURNING url_path, domain_id, discovered_at_depth, crawl_id;
-            """)
-            
-            result = await cursor.fetchone()
+                SET crawl_status = 'not_visited', claimed_by = NULL, lease_expires_at = NULL
+                WHERE crawl_status IN ('queued', 'in_progress')
+                  AND (lease_expires_at IS NULL OR lease_expires_at < NOW())
+            """, prepare=True)
             await conn.commit()
-            
-            return result
+        if cursor.rowcount:
+            logger.info(f"Reaped {cursor.rowcount} URLs with expired leases")
+        return cursor.rowcount
     except Exception as e:
-        logger.error(f"Error fetching and claiming domain: {e}")
         await conn.rollback()
-        return None
+        logger.error(f"Error reaping expired leases: {e}")
+        return 0
+
+
+async def bulk_update_crawled_url_status(conn, updates):
+    """
+    Apply many status transitions with one statement; updates are (crawl_id, status, crawled_at).
+    Each transition ends the row's lease.
+    Rows are updated in crawl_id order so concurrent batches lock them in the same order.
+    Does not commit - the caller owns the transaction. Returns the number of rows updated.
+    """
+    if not updates:
+        return 0
+    
+    crawl_ids, statuses, crawled_ats = (list(column) for column in zip(*sorted(updates)))
+    async with conn.cursor() as cursor:
+        await cursor.execute("""
+            UPDATE crawled_url c
+            SET crawl_status = u.crawl_status, crawled_at = u.crawled_at,
+                claimed_by = NULL, lease_expires_at = NULL
+            FROM unnest(%s::bigint[], %s::text[], %s::timestamp[]) AS u(crawl_id, crawl_status, crawled_at)
+            WHERE c.crawl_id = u.crawl_id
+        """, (crawl_ids, statuses, crawled_ats), prepare=True)
+        return cursor.rowcount
+
+
+async def bulk_update_revisit_state(conn, updates):
+    """
+    Store what the next visit of each URL needs; updates are
+    (crawl_id, etag, last_modified, link_digest, revisit_seconds). A NULL interval means
+    the URL is not revisited. Does not commit - the caller owns the transaction.
+    """
+    if not updates:
+        return 0
+    
+    crawl_ids, etags, last_modifieds, digests, intervals = (list(column) for column in zip(*sorted(updates, key=lambda u: u[0])))
+    async with conn.cursor() as cursor:
+        await cursor.execute("""
+            UPDATE crawled_url c
+            SET etag = u.etag, last_modified = u.last_modified, link_digest = u.link_digest,
+                revisit_seconds = u.revisit_seconds,
+                next_visit_at = NOW() + make_interval(secs => u.revisit_seconds)
+            FROM unnest(%s::bigint[], %s::text[], %s::text[], %s::bytea[], %s::integer[])
+                AS u(crawl_id, etag, last_modified, link_digest, revisit_seconds)
+            WHERE c.crawl_id = u.crawl_id
+        """, (crawl_ids, etags, last_modifieds, digests, intervals), prepare=True)
+        return cursor.rowcount
+
+
+async def bulk_update_yield_curves(conn, updates):
+    """
+    Store the yield curves of rendered URLs; updates are (crawl_id, yield_curve) with the
+    curve as JSON text. Does not commit - the caller owns the transaction.
+    """
+    if not updates:
+        return 0
     
-async def update_crawled_url_status(conn,url_path, status): 
+    crawl_ids, curves = (list(column) for column in zip(*sorted(updates, key=lambda u: u[0])))
+    async with conn.cursor() as cursor:
+        await cursor.execute("""
+            UPDATE crawled_url c
+            SET yield_curve = u.yield_curve::jsonb
+            FROM unnest(%s::bigint[], %s::text[]) AS u(crawl_id, yield_curve)
+            WHERE c.crawl_id = u.crawl_id
+        """, (crawl_ids, curves), prepare=True)
+        return cursor.rowcount
+
+
+async def requeue_due_revisits(conn):
+    """
+    Put visited pages whose revisit time has come back into the frontier, and reopen their
+    completed seed domains. Returns the number of URLs requeued.
+    """
     try:
         async with conn.cursor() as cursor:
-            
-            await cursor.execute(
-            """
+            await cursor.execute("""
+                WITH due AS (
                     UPDATE crawled_url
-                    SET crawl_status = %s, crawled_at = NOW()
-                    WHERE url_path = %s
-            """, (status, url_path))
-        
+                    SET crawl_status = 'not_visited'
+                    WHERE crawl_status = 'visited' AND next_visit_at <= NOW()
+                    RETURNING domain_id
+                ),
+                reopened AS (
+                    UPDATE seed_domain
+                    SET status = 'pending', completed_at = NULL
+                    WHERE status = 'completed' AND domain_id IN (SELECT domain_id FROM due)
+                    RETURNING domain_id
+                )
+                SELECT (SELECT COUNT(*) FROM due), (SELECT COUNT(*) FROM reopened)
+            """)
+            requeued, reopened = await cursor.fetchone()
         await conn.commit()
-        logger.info(f"Updated URL ID {url_path} status to {status}")
+        if requeued:
+            logger.info(f"Requeued {requeued} URLs due for a revisit ({reopened} domains reopened)")
+        return requeued
     except Exception as e:
         await conn.rollback()
-        logger.error(f"Error updating status for URL ID {url_path}: {e}") 
-        
-        
-async def update_unique_links(conn, domain_id):
+        logger.error(f"Error requeueing due revisits: {e}")
+        return 0
+
+
+async def increment_unique_links(conn, domain_id, new_urls):
+    """
+    Add newly discovered unique URLs to seed_domain.total_urls_found.
+    Does not commit, so the bump lands in the same transaction as the insert it counts.
+    """
+    if not new_urls:
+        return
+    async with conn.cursor() as cursor:
+        await cursor.execute("""
+            UPDATE seed_domain
+            SET total_urls_found = COALESCE(total_urls_found, 0) + %s
+            WHERE domain_id = %s
+        """, (new_urls, domain_id), prepare=True)
+
+
+async def reconcile_unique_links(conn, domain_id=None):
+    """
+    Recompute total_urls_found from crawled_url to fix counter drift
+    (e.g. two workers counting the same new URL at the same time).
+    Scans crawled_url, so run it offline rather than per insert.
+    """
     try:
         async with conn.cursor() as cursor:
-            # Get the distinct count of url_hash for this domain
             await cursor.execute("""
-                SELECT COUNT(DISTINCT url_hash)
-                FROM crawled_url
-                WHERE domain_id = %s
-            """, (domain_id,))
-            
-            result = await cursor.fetchone()
-            unique_count = result[0] if result else 0
-            
-            # Update the seed_domain table with the unique count
-            await cursor.execute("""
-                UPDATE seed_domain
-                SET total_urls_found = %s
-                WHERE domain_id = %s
-            """, (unique_count, domain_id))
+                UPDATE seed_domain s
+                SET total_urls_found = COALESCE(c.unique_count, 0)
+                FROM seed_domain d
+                LEFT JOIN (
+                    SELECT domain_id, COUNT(DISTINCT url_hash) AS unique_count
+                    FROM crawled_url
+                    WHERE %(domain_id)s::bigint IS NULL OR domain_id = %(domain_id)s
+                    GROUP BY domain_id
+                ) c ON c.domain_id = d.domain_id
+                WHERE s.domain_id = d.domain_id
+                  AND (%(domain_id)s::bigint IS NULL OR d.domain_id = %(domain_id)s)
+                  AND s.total_urls_found IS DISTINCT FROM COALESCE(c.unique_count, 0)
+            """, {'domain_id': domain_id})
+            fixed = cursor.rowcount
             
         await conn.commit()
-        
+        logger.info(f"Reconciled unique link counts: {fixed} domain(s) corrected")
+        return fixed
             
     except Exception as e:
-        logger.error(f"Error updating unique links count: {e}")
+        logger.error(f"Error reconciling unique links count: {e}")
         await conn.rollback()
         return None
-    
\ No newline at end of file
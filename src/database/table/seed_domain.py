@@ -2,36 +2,24 @@ from status.logger import logger
 import datetime
 import json
 
-async def create_seed_domain_table(conn):
-    """Create table with url_id as primary key and url_path as unique constraint"""
-    try:
-        async with conn.cursor() as cursor:
-            await cursor.execute("""
-                DROP SEQUENCE IF EXISTS domain_id_seq CASCADE;
-                CREATE SEQUENCE domain_id_seq START 1;
-                                 
-                CREATE TABLE IF NOT EXISTS seed_domain (
-                        domain_id TEXT PRIMARY KEY DEFAULT 'domain' || nextval('domain_id_seq'),
-                        domain VARCHAR(255) NOT NULL UNIQUE,
-                        created_at TIMESTAMP NOT NULL,
-                        status TEXT NOT NULL DEFAULT 'pending', 
-                        max_depth INTEGER NOT NULL DEFAULT 5,
-                        current_depth INTEGER NOT NULL DEFAULT 0,
-                        started_at TIMESTAMP,
-                        completed_at TIMESTAMP,
-                        total_urls_found INTEGER DEFAULT 0
-                    );
-                        
-                CREATE INDEX IF NOT EXISTS idx_domain_status ON seed_domain(status);
-            """)
-        
-        await conn.commit()
-        logger.info("Seed-Domain Table created successfully with primary key and unique constraints")
-    except Exception as e:
-        await conn.rollback()
-        logger.error(f"Error creating table: {e}")
-        
-        
+# seed_domain table, its identity key and status index
+SEED_DOMAIN_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seed_domain (
+        domain_id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        domain VARCHAR(255) NOT NULL UNIQUE,
+        created_at TIMESTAMP NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        max_depth INTEGER NOT NULL DEFAULT 5,
+        current_depth INTEGER NOT NULL DEFAULT 0,
+        started_at TIMESTAMP,
+        completed_at TIMESTAMP,
+        total_urls_found INTEGER DEFAULT 0
+    );
+
+CREATE INDEX IF NOT EXISTS idx_domain_status ON seed_domain(status);
+"""
+
+
 async def insert_into_seed_domain_table(conn):
     with open('assests/seed_domain.json', 'r') as f:
         data = json.load(f)
@@ -47,8 +35,8 @@ async def insert_into_seed_domain_table(conn):
         
         for domain in domains:
             await cursor.execute("""
-                INSERT INTO seed_domain (domain_id, domain, created_at, status, max_depth, current_depth, started_at, completed_at, total_urls_found)
-                VALUES ('domain' || nextval('domain_id_seq'), %s, %s, %s, %s, %s, %s, %s, %s)
+                INSERT INTO seed_domain (domain, created_at, status, max_depth, current_depth, started_at, completed_at, total_urls_found)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
                 ON CONFLICT (domain) DO NOTHING
             """, (domain, datetime.datetime.now(), 'pending', 5, 0, None, None, 0))
             
@@ -67,23 +55,32 @@ async def insert_into_seed_domain_table(conn):
         logger.info(f"Skipped {len(skipped_domains)} existing domains: {', '.join(skipped_domains)}")
             
       
-async def fetch_domain_url(conn):
+async def fetch_domain_url(conn, owner=None, lease_seconds=300):
+    """
+    Claim a seed domain for `owner`: one this owner already holds (its workers share a domain),
+    else a pending one, else one whose previous owner stopped renewing its lease.
+    """
     try:
         async with conn.cursor() as cursor:
-            # Atomically select one pending domain and mark it as in progress
             await cursor.execute("""
                 UPDATE seed_domain 
-                SET status = 'progessing', started_at = NOW()
+                SET status = 'progessing',
+                    started_at = COALESCE(started_at, NOW()),
+                    claimed_by = %(owner)s,
+                    lease_expires_at = NOW() + make_interval(secs => %(lease_seconds)s)
                 WHERE domain_id = (
                     SELECT domain_id
                     FROM seed_domain
-                    WHERE status = 'progessing' 
-                    ORDER BY domain_id DESC
+                    WHERE (status = 'progessing' AND claimed_by = %(owner)s)
+                       OR status = 'pending'
+                       OR (status = 'progessing' AND (lease_expires_at IS NULL OR lease_expires_at < NOW()))
+                    ORDER BY (claimed_by IS NOT DISTINCT FROM %(owner)s AND status = 'progessing') DESC,
+                             domain_id DESC
                     LIMIT 1
-                    
+                    FOR UPDATE SKIP LOCKED
                 )
                 RETURNING domain_id, domain, max_depth;
-            """)
+            """, {'owner': owner, 'lease_seconds': lease_seconds})
             
             result = await cursor.fetchone()
             await conn.commit()
@@ -95,50 +92,41 @@ async def fetch_domain_url(conn):
         return None
 
 
-async def update_completed_at(conn, domain_id):
+async def renew_domain_leases(conn, owner, lease_seconds):
+    """Heartbeat for the seed domains `owner` is crawling"""
     try:
-        async with conn.cursor() as cursor:
+        async with conn.pipeline(), conn.cursor() as cursor:
             await cursor.execute("""
-                    UPDATE seed_domain
-                    SET completed_at = NOW()
-                    WHERE domain_id = %s
-                             """, (domain_id,))
-        await conn.commit()
-            
-            
-    except Exception as e:
-        logger.error(f"Error updating the completed_at timestamp: {e}")
-        await conn.rollback()
-        return None
-    
-async def update_status(conn, domain_id):
-    try:
-        async with conn.cursor() as cursor:
-            await cursor.execute("""
-                    UPDATE seed_domain
-                    SET status = 'completed' 
-                    WHERE domain_id = %s
-                             """, (domain_id,))
-        await conn.commit()
-            
-            
+                UPDATE seed_domain
+                SET lease_expires_at = NOW() + make_interval(secs => %s)
+                WHERE claimed_by = %s AND status = 'progessing'
+            """, (lease_seconds, owner), prepare=True)
+            await conn.commit()
+        return cursor.rowcount
     except Exception as e:
-        logger.error(f"Error updating the status of the domain: {e}")
         await conn.rollback()
-        return None
+        logger.error(f"Error renewing domain leases: {e}")
+        return 0
+
+
+async def bulk_update_seed_domains(conn, updates):
+    """
+    Apply buffered domain changes with one statement; updates are
+    (domain_id, current_depth, status, completed_at) with None meaning "leave as is".
+    Does not commit - the caller owns the transaction.
+    """
+    if not updates:
+        return 0
     
-async def update_depth(conn, depth, domain_id):
-    try:
-        async with conn.cursor() as cursor:
-            await cursor.execute("""
-                    UPDATE seed_domain
-                    SET current_depth = %s 
-                    WHERE domain_id = %s
-                             """, (depth, domain_id,))
-        await conn.commit()
-            
-            
-    except Exception as e:
-        logger.error(f"Error updating the status of the domain: {e}")
-        await conn.rollback()
-        return None
\ No newline at end of file
+    domain_ids, depths, statuses, completed_ats = (list(column) for column in zip(*sorted(updates, key=lambda u: u[0])))
+    async with conn.cursor() as cursor:
+        await cursor.execute("""
+            UPDATE seed_domain s
+            SET current_depth = COALESCE(u.current_depth, s.current_depth),
+                status = COALESCE(u.status, s.status),
+                completed_at = COALESCE(u.completed_at, s.completed_at)
+            FROM unnest(%s::bigint[], %s::integer[], %s::text[], %s::timestamp[])
+                AS u(domain_id, current_depth, status, completed_at)
+            WHERE s.domain_id = u.domain_id
+        """, (domain_ids, depths, statuses, completed_ats), prepare=True)
+        return cursor.rowcount
@@ -0,0 +1,57 @@
+from status.logger import logger
+
+# One row per seed domain: the load-more, pagination and scroll strategy that worked there
+SITE_PROFILE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS site_profile (
+        domain_id BIGINT PRIMARY KEY REFERENCES seed_domain(domain_id) ON DELETE CASCADE,
+        load_more_selector TEXT,
+        pagination_mode TEXT,
+        pagination_selector TEXT,
+        scroll_mode TEXT,
+        pages_since_probe INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+"""
+
+
+async def fetch_site_profile(conn, domain_id):
+    """The stored profile row of a domain as a dict, or None if it has never been probed"""
+    try:
+        async with conn.cursor() as cursor:
+            await cursor.execute("""
+                SELECT load_more_selector, pagination_mode, pagination_selector, scroll_mode, pages_since_probe
+                FROM site_profile
+                WHERE domain_id = %s
+            """, (domain_id,), prepare=True)
+            row = await cursor.fetchone()
+        await conn.commit()
+        if row is None:
+            return None
+        return dict(zip(('load_more_selector', 'pagination_mode', 'pagination_selector', 'scroll_mode', 'pages_since_probe'), row))
+    except Exception as e:
+        await conn.rollback()
+        logger.error(f"Error fetching site profile: {e}")
+        return None
+
+
+async def upsert_site_profile(conn, domain_id, profile):
+    """Insert or replace a domain's profile from a dict shaped like fetch_site_profile's result"""
+    try:
+        async with conn.pipeline(), conn.cursor() as cursor:
+            await cursor.execute("""
+                INSERT INTO site_profile (domain_id, load_more_selector, pagination_mode, pagination_selector, scroll_mode, pages_since_probe, updated_at)
+                VALUES (%(domain_id)s, %(load_more_selector)s, %(pagination_mode)s, %(pagination_selector)s, %(scroll_mode)s, %(pages_since_probe)s, NOW())
+                ON CONFLICT (domain_id) DO UPDATE
+                SET load_more_selector = EXCLUDED.load_more_selector,
+                    pagination_mode = EXCLUDED.pagination_mode,
+                    pagination_selector = EXCLUDED.pagination_selector,
+                    scroll_mode = EXCLUDED.scroll_mode,
+                    pages_since_probe = EXCLUDED.pages_since_probe,
+                    updated_at = NOW()
+            """, dict(profile, domain_id=domain_id), prepare=True)
+            await conn.commit()
+        return True
+    except Exception as e:
+        await conn.rollback()
+        logger.error(f"Error saving site profile: {e}")
+        return False
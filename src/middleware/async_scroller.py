@@ -0,0 +1,134 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from status.logger import logger
+
+
+class AsyncSeleniumScroller:
+    """
+    Async facade over a SeleniumScroller.
+
+    Every blocking Selenium call runs on the pool's bounded thread executor so the
+    event loop keeps serving other workers and database writes. A call that times
+    out or is cancelled aborts the browser: the scroller's cancel_event stops its
+    loops and the driver is quit so any chromedriver request in flight returns.
+    The browser is then marked broken and discarded when the lease ends.
+    """
+
+    def __init__(self, scroller, executor, timeout=None):
+        self.scroller = scroller
+        self.executor = executor
+        self.timeout = timeout
+        self.broken = False
+
+    async def _run(self, func, *args, timeout=None, **kwargs):
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        except asyncio.TimeoutError:
+            logger.info(f"Browser call {func.__name__} timed out, aborting browser")
+            self.abort()
+            raise
+        except asyncio.CancelledError:
+            logger.info(f"Browser call {func.__name__} cancelled, aborting browser")
+            self.abort()
+            raise
+
+    def abort(self):
+        """Stop whatever the browser is doing; safe to call from the event loop thread"""
+        if self.broken:
+            return
+        self.broken = True
+        self.scroller.cancel_event.set()
+        # Quitting talks to chromedriver, so do it off the event loop and off the bounded executor
+        threading.Thread(target=self.scroller.close, name="selenium-abort", daemon=True).start()
+
+    @property
+    def page_yield(self):
+        """Yield curves of the page being rendered (a plain attribute read, no browser call)"""
+        return self.scroller.page_yield
+
+    async def scroll_to_bottom(self, url, scroll_pause_time=1.0, max_scrolls=200, profile=None, timeout=None):
+        return await self._run(self.scroller.scroll_to_bottom, url, scroll_pause_time=scroll_pause_time, max_scrolls=max_scrolls, profile=profile, timeout=timeout)
+
+    @property
+    def url_pagination(self):
+        """Page-number link left by pagination(defer_url_pages=True), or None"""
+        return self.scroller.url_pagination
+
+    async def pagination(self, defer_url_pages=False, timeout=None):
+        return await self._run(self.scroller.pagination, defer_url_pages=defer_url_pages, timeout=timeout)
+
+    async def load_page_links(self, url, timeout=None):
+        return await self._run(self.scroller.load_page_links, url, timeout=timeout)
+
+    async def check_and_click_load_more(self, timeout=None):
+        return await self._run(self.scroller.check_and_click_load_more, timeout=timeout)
+
+    async def extract_and_clear_dom(self, timeout=None):
+        return await self._run(self.scroller.extract_and_clear_dom, timeout=timeout)
+
+
+class AsyncBrowserPool:
+    """
+    Async front end for BrowserPool.
+
+    Concurrency is bounded by the browser pool size: at most that many leases are
+    outstanding, and the thread executor has exactly that many threads, so a
+    launch, a page render and a reset never queue behind each other's threads.
+    """
+
+    def __init__(self, browser_pool, timeout=None):
+        self.browser_pool = browser_pool
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=browser_pool.size, thread_name_prefix="selenium")
+        self._slots = asyncio.Semaphore(browser_pool.size)
+
+    @asynccontextmanager
+    async def lease(self, timeout=None):
+        """
+        Borrow a browser wrapped in an AsyncSeleniumScroller.
+        The browser goes back to the pool on every path, including when the caller is cancelled
+        while the acquire or the release is still running on a pool thread.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            acquiring = loop.run_in_executor(self.executor, self.browser_pool.acquire)
+            try:
+                # Shielded, so a cancellation cannot drop a browser the thread goes on to acquire
+                scroller = await asyncio.shield(acquiring)
+            except asyncio.CancelledError:
+                acquiring.add_done_callback(self._release_abandoned)
+                raise
+            
+            discard = True
+            facade = None
+            try:
+                facade = AsyncSeleniumScroller(scroller, self.executor, timeout or self.timeout)
+                yield facade
+                discard = facade.broken
+            finally:
+                releasing = loop.run_in_executor(self.executor, self.browser_pool.release, scroller, discard)
+                # A cancelled wait must not cancel the release itself while it is still queued
+                await asyncio.shield(releasing)
+
+    def _release_abandoned(self, acquiring):
+        """Hand back a browser whose lease was cancelled while the pool thread was acquiring it"""
+        if acquiring.cancelled() or acquiring.exception() is not None:
+            return
+        logger.info("Returning a browser acquired for a cancelled lease")
+        try:
+            self.executor.submit(self.browser_pool.release, acquiring.result())
+        except RuntimeError:
+            # The executor is already shut down; release still frees the slot and quits the browser
+            self.browser_pool.release(acquiring.result(), discard=True)
+
+    def log_metrics(self):
+        self.browser_pool.log_metrics()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.browser_pool.close()
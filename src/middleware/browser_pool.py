@@ -0,0 +1,156 @@
+import time
+import threading
+from contextlib import contextmanager
+from middleware.scroller_pager import SeleniumScroller
+from status.logger import logger
+
+
+class BrowserPool:
+    """
+    Keeps a small set of warm SeleniumScroller browsers and hands them out per page.
+
+    Browsers are health-checked when they are handed out, reset (cookies cleared,
+    about:blank loaded) when they come back, and recycled after max_pages_per_browser
+    pages so long-lived Chrome processes do not keep growing.
+    """
+
+    def __init__(self, size=1, headless=True, driver_path=r'C:\Program Files\chromedriver-win64\chromedriver.exe', max_pages_per_browser=50, blocker=None, yield_rules=None):
+        self.size = size
+        self.headless = headless
+        self.driver_path = driver_path
+        self.max_pages_per_browser = max_pages_per_browser
+        # Shared ResourceBlocker installed in every browser the pool launches
+        self.blocker = blocker
+        # Per-domain stopping thresholds for scrolling and pagination
+        self.yield_rules = yield_rules
+
+        self._idle = []
+        self._lock = threading.Lock()
+        # Bounds the number of live browsers (idle + leased) to the pool size
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+        self.metrics = {
+            'hits': 0,
+            'misses': 0,
+            'launches': 0,
+            'launch_seconds': 0.0,
+            'recycled': 0,
+            'discarded': 0,
+            'health_failures': 0,
+        }
+
+    def _launch(self):
+        started = time.perf_counter()
+        scroller = SeleniumScroller(headless=self.headless, driver_path=self.driver_path, blocker=self.blocker, yield_rules=self.yield_rules)
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self.metrics['launches'] += 1
+            self.metrics['launch_seconds'] += elapsed
+        logger.info(f"Browser pool launched a new browser in {elapsed:.2f}s")
+        return scroller
+
+    def acquire(self):
+        """Hand out a warm, healthy browser, launching one if none is idle"""
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    scroller = self._idle.pop() if self._idle else None
+
+                if scroller is None:
+                    with self._lock:
+                        self.metrics['misses'] += 1
+                    return self._launch()
+
+                if scroller.is_alive():
+                    with self._lock:
+                        self.metrics['hits'] += 1
+                    return scroller
+
+                logger.info("Browser pool dropped an idle browser that failed its health check")
+                with self._lock:
+                    self.metrics['health_failures'] += 1
+                scroller.close()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, scroller, discard=False):
+        """Return a browser to the pool, recycling it if it is worn out or broken"""
+        try:
+            scroller.pages_served += 1
+
+            if discard or self._closed:
+                with self._lock:
+                    self.metrics['discarded'] += 1
+                scroller.close()
+                return
+
+            try:
+                scroller.log_resource_savings()
+            except Exception as e:
+                logger.info(f"Could not collect resource stats: {e}")
+
+            if scroller.pages_served >= self.max_pages_per_browser:
+                logger.info(f"Recycling browser after {scroller.pages_served} pages")
+                with self._lock:
+                    self.metrics['recycled'] += 1
+                scroller.close()
+                return
+
+            if not scroller.reset():
+                with self._lock:
+                    self.metrics['discarded'] += 1
+                scroller.close()
+                return
+
+            with self._lock:
+                self._idle.append(scroller)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def lease(self):
+        """Context manager around acquire/release; browsers that raised are discarded"""
+        scroller = self.acquire()
+        try:
+            yield scroller
+        except Exception:
+            self.release(scroller, discard=True)
+            raise
+        else:
+            self.release(scroller)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.metrics)
+            stats['idle'] = len(self._idle)
+        requests = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / requests if requests else 0.0
+        stats['avg_launch_seconds'] = stats['launch_seconds'] / stats['launches'] if stats['launches'] else 0.0
+        return stats
+
+    def log_metrics(self):
+        stats = self.stats()
+        logger.info(
+            f"Browser pool: hits={stats['hits']} misses={stats['misses']} hit_rate={stats['hit_rate']:.1%} "
+            f"launches={stats['launches']} avg_launch={stats['avg_launch_seconds']:.2f}s "
+            f"recycled={stats['recycled']} discarded={stats['discarded']} "
+            f"health_failures={stats['health_failures']} idle={stats['idle']}"
+        )
+        if self.blocker is not None:
+            self.blocker.log_metrics()
+
+    def close(self):
+        """Quit every idle browser; leased browsers are quit when they are released"""
+        self._closed = True
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for scroller in idle:
+            scroller.close()
+        self.log_metrics()
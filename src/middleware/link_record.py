@@ -0,0 +1,17 @@
+from typing import NamedTuple
+
+
+# crawled_url.url_content is VARCHAR(100)
+MAX_LINK_TEXT = 100
+
+
+class LinkRecord(NamedTuple):
+    """A discovered link: its href and anchor text, stored as a plain tuple (no per-instance dict)"""
+    href: str
+    text: str
+
+    @classmethod
+    def from_raw(cls, href, text):
+        """Collapse whitespace and cut the text to what url_content can hold"""
+        text = " ".join((text or "").split())[:MAX_LINK_TEXT]
+        return cls(href or "", text)
@@ -0,0 +1,177 @@
+import json
+import threading
+from status.logger import logger
+
+
+# URL patterns per CDP resource type. Network.setBlockedURLs matches URLs, not types, so each
+# blocked type is expressed through the file extensions it is served with.
+TYPE_PATTERNS = {
+    'Image': ['png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico', 'bmp'],
+    'Media': ['mp4', 'webm', 'm3u8', 'mpd', 'mp3', 'ogg', 'wav', 'mov'],
+    'Font': ['woff', 'woff2', 'ttf', 'otf', 'eot'],
+    'Stylesheet': ['css'],
+}
+
+# The one source of the block list. The seed config can switch blocking off, replace the
+# resource types, add or allow domains and add URL patterns. Stylesheets stay allowed because
+# scroll heights and load-more buttons depend on layout.
+DEFAULT_BLOCKING = {
+    'enabled': True,
+    'resource_types': ['Image', 'Media', 'Font'],
+    'domains': [
+        'doubleclick.net', 'googlesyndication.com', 'googleadservices.com', 'adservice.google.com',
+        'google-analytics.com', 'googletagmanager.com', 'googletagservices.com',
+        'facebook.net', 'connect.facebook.com', 'platform.twitter.com', 'scorecardresearch.com',
+        'amazon-adsystem.com', 'taboola.com', 'outbrain.com', 'chartbeat.com', 'chartbeat.net',
+        'hotjar.com', 'clarity.ms', 'quantserve.com', 'criteo.com', 'adnxs.com', 'pubmatic.com',
+        'onesignal.com', 'youtube.com/embed', 'player.vimeo.com',
+    ],
+    'url_patterns': [],
+}
+
+# Rough transfer size per CDP resource type, used to estimate what a blocked request would have cost
+TYPICAL_BYTES = {
+    'Image': 40_000,
+    'Media': 500_000,
+    'Font': 40_000,
+    'Stylesheet': 20_000,
+    'Script': 50_000,
+    'Document': 60_000,
+    'XHR': 5_000,
+    'Fetch': 5_000,
+    'Ping': 500,
+}
+DEFAULT_TYPICAL_BYTES = 10_000
+
+
+class ResourceBlocker:
+    """
+    Blocks non-essential requests in a Chrome session through CDP Network.setBlockedURLs
+    (resource types by extension, third-party ad/analytics domains, and raw URL patterns),
+    and measures what was saved from chromedriver's performance log.
+
+    One blocker is shared by every browser in the pool; its totals are thread-safe.
+    """
+
+    def __init__(self, resource_types=None, domains=None, url_patterns=None, enabled=True):
+        self.enabled = enabled
+        self.resource_types = list(DEFAULT_BLOCKING['resource_types'] if resource_types is None else resource_types)
+        self.domains = list(DEFAULT_BLOCKING['domains'] if domains is None else domains)
+        self.patterns = self._build_patterns(url_patterns or [])
+
+        self._lock = threading.Lock()
+        self.totals = {'pages': 0, 'requests': 0, 'bytes': 0, 'blocked': 0, 'blocked_bytes': 0}
+
+    def _build_patterns(self, url_patterns):
+        patterns = []
+        for resource_type in self.resource_types:
+            extensions = TYPE_PATTERNS.get(resource_type)
+            if extensions is None:
+                logger.warning(f"Unknown resource type to block: {resource_type}")
+                continue
+            for extension in extensions:
+                # With and without a query string, e.g. logo.png and logo.png?v=3
+                patterns.append(f"*.{extension}")
+                patterns.append(f"*.{extension}?*")
+        for domain in self.domains:
+            # '*' also matches dots, so this covers the domain and every subdomain
+            patterns.append(f"*{domain}/*" if '/' not in domain else f"*{domain}*")
+        patterns.extend(url_patterns)
+        return patterns
+
+    def configure_options(self, chrome_options):
+        """Chrome options the blocker depends on; call before the driver is created"""
+        if not self.enabled:
+            return
+        # Network events only, so the log stays small enough to drain once per page
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        chrome_options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+
+    def apply(self, driver):
+        """Install the blocklist on a freshly started driver"""
+        if not self.enabled or not self.patterns:
+            return
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.patterns})
+        logger.debug(f"Blocking {len(self.patterns)} URL patterns")
+
+    def collect(self, driver):
+        """
+        Drain the performance log and summarize the requests since the previous call:
+        requests and bytes actually loaded, requests blocked, and the bytes the blocked ones
+        would roughly have cost.
+        """
+        page = {'requests': 0, 'bytes': 0, 'blocked': 0, 'blocked_bytes': 0}
+        if not self.enabled:
+            return page
+        try:
+            entries = driver.get_log('performance')
+        except Exception as e:
+            logger.debug(f"Could not read the performance log: {e}")
+            return page
+
+        types = {}
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.requestWillBeSent':
+                types[params.get('requestId')] = params.get('type')
+            elif method == 'Network.loadingFinished':
+                page['requests'] += 1
+                page['bytes'] += int(params.get('encodedDataLength') or 0)
+            elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+                resource_type = params.get('type') or types.get(params.get('requestId'))
+                page['blocked'] += 1
+                page['blocked_bytes'] += TYPICAL_BYTES.get(resource_type, DEFAULT_TYPICAL_BYTES)
+
+        with self._lock:
+            self.totals['pages'] += 1
+            for key, value in page.items():
+                self.totals[key] += value
+        return page
+
+    def log_metrics(self):
+        with self._lock:
+            totals = dict(self.totals)
+        if not self.enabled:
+            return
+        logger.info(
+            f"Resource blocking: pages={totals['pages']} blocked={totals['blocked']} requests "
+            f"(~{totals['blocked_bytes'] / 1_048_576:.1f} MB saved), loaded={totals['requests']} requests "
+            f"({totals['bytes'] / 1_048_576:.1f} MB)"
+        )
+
+
+def load_resource_blocker(path='assests/seed_domain.json', enabled=True):
+    """
+    Build a ResourceBlocker from DEFAULT_BLOCKING and the optional "resource_blocking" section
+    of the seed config: "extra_domains" are blocked on top of the defaults, "allow_domains"
+    are taken out of them.
+    """
+    try:
+        with open(path, 'r') as f:
+            config = json.load(f).get('resource_blocking', {})
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read resource blocking rules from {path}, using defaults: {e}")
+        config = {}
+
+    if 'domains' in config:
+        logger.warning("resource_blocking.domains is ignored; use extra_domains and allow_domains")
+    allowed = set(config.get('allow_domains', []))
+    domains = [domain for domain in DEFAULT_BLOCKING['domains'] if domain not in allowed]
+    domains += [domain for domain in config.get('extra_domains', []) if domain not in domains]
+    blocker = ResourceBlocker(
+        resource_types=config.get('resource_types', DEFAULT_BLOCKING['resource_types']),
+        domains=domains,
+        url_patterns=DEFAULT_BLOCKING['url_patterns'] + config.get('url_patterns', []),
+        enabled=enabled and config.get('enabled', DEFAULT_BLOCKING['enabled']),
+    )
+    logger.info(
+        f"Loaded resource blocking rules ({len(blocker.patterns)} URL patterns"
+        f"{'' if blocker.enabled else ', disabled'})"
+    )
+    return blocker
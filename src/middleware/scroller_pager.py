@@ -5,16 +5,17 @@ import socket
 import gc 
 import re
 import subprocess
+import threading
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from scrapy import Spider, Request
 from scrapy.crawler import CrawlerProcess
 from time import sleep
 from status.logger import logger
-from selenium.webdriver.support.ui import WebDriverWait
+from middleware.link_record import LinkRecord
+from middleware.yield_policy import YieldRules
 from urllib.parse import urljoin, urlparse
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
@@ -23,11 +24,161 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException,
 http.client.HTTPConnection.timeout = 1200  
 socket.setdefaulttimeout(1200) 
 
+# Installs a MutationObserver plus fetch/XHR/resource tracking so we can tell when the page goes quiet
+SETTLE_TRACKER_SCRIPT = """
+    if (!window.__crawlerSettle) {
+        const tracker = window.__crawlerSettle = {
+            pending: 0,
+            lastMutation: performance.now(),
+            lastNetwork: performance.now()
+        };
+        const touchNetwork = () => { tracker.lastNetwork = performance.now(); };
+        
+        new MutationObserver(() => { tracker.lastMutation = performance.now(); })
+            .observe(document.documentElement, {childList: true, subtree: true});
+        
+        if (window.fetch) {
+            const originalFetch = window.fetch;
+            window.fetch = function(...args) {
+                tracker.pending++;
+                touchNetwork();
+                return originalFetch.apply(this, args).finally(() => { tracker.pending--; touchNetwork(); });
+            };
+        }
+        
+        const originalSend = XMLHttpRequest.prototype.send;
+        XMLHttpRequest.prototype.send = function(...args) {
+            tracker.pending++;
+            touchNetwork();
+            this.addEventListener('loadend', () => { tracker.pending--; touchNetwork(); }, {once: true});
+            return originalSend.apply(this, args);
+        };
+        
+        // Images, scripts and iframes are not fetch/XHR but still mean the page is loading
+        try {
+            new PerformanceObserver(touchNetwork).observe({type: 'resource'});
+        } catch (e) {}
+    }
+"""
+
+# Resolves once the DOM and network have been quiet for quietMs (after at least minMs), or after maxMs
+SETTLE_WAIT_SCRIPT = """
+    const [quietMs, minMs, maxMs] = arguments;
+    const done = arguments[arguments.length - 1];
+    const start = performance.now();
+    (function poll() {
+        const tracker = window.__crawlerSettle;
+        const now = performance.now();
+        const quiet = !tracker || (tracker.pending <= 0 &&
+                                   now - tracker.lastMutation >= quietMs &&
+                                   now - tracker.lastNetwork >= quietMs);
+        if ((quiet && now - start >= minMs) || now - start >= maxMs) {
+            done({elapsed: (now - start) / 1000, settled: quiet});
+        } else {
+            setTimeout(poll, 50);
+        }
+    })();
+"""
+
+# CSS selectors of "load more" buttons seen on the seed sites
+LOAD_MORE_SELECTORS = [
+    "[onclick*='loadMore']",           # Original
+    "button.ant-btn.ant-btn-primary.w-fit",  # Pattern 1
+    "button.load__moreGrid",           # Pattern 2  
+    "a.td_ajax_load_more", 
+    "button#btnLoadMore"
+]
+
+# CSS selectors of clickable pagination links; {page} is the page number
+PAGE_LINK_SELECTORS = [
+    "a[id='{page}']",
+    "li.next a[href]"
+]
+
+# Links whose href carries a page number (URL-based pagination)
+PAGE_URL_XPATH = "//a[(contains(@href, 'cat=') and contains(@href, 'paged=')) or (contains(@href, 'category_id=') and contains(@href, 'page=')) or contains(@href, '/page/') or contains(@href, 'page=') or (contains(@href, 'per=') and contains(@href, 'p=')) ]"
+
+# Page number inside a pagination URL: ?paged=3, ?page=3, /page/3, ?p=3
+PAGE_NUMBER_PATTERN = re.compile(r'(paged=|page[/=]|p=)(\d+)')
+
+
+def is_page_url(href):
+    """PAGE_URL_XPATH's test for a link of URL-based pagination, for hrefs outside the browser"""
+    return bool(
+        (('cat=' in href and 'paged=' in href) or ('category_id=' in href and 'page=' in href) or
+         '/page/' in href or 'page=' in href or ('per=' in href and 'p=' in href))
+        and PAGE_NUMBER_PATTERN.search(href)
+    )
+
+
+def numbered_page_url(link, page_num):
+    """A pagination link rewritten to point at page_num"""
+    return PAGE_NUMBER_PATTERN.sub(lambda m: f"{m.group(1)}{page_num}", link)
+
+
+# Tests every candidate selector (CSS or XPath) for presence, visibility and clickability in one
+# call, polling until one is clickable or maxMs passes. Returns the candidates present on the page,
+# best first, each with its best matching element.
+SELECTOR_PROBE_SCRIPT = """
+    const [candidates, maxMs] = arguments;
+    const done = arguments[arguments.length - 1];
+    const start = performance.now();
+    
+    function matches(candidate) {
+        try {
+            if (!candidate.xpath) {
+                return Array.from(document.querySelectorAll(candidate.selector));
+            }
+            const snapshot = document.evaluate(candidate.selector, document, null,
+                                               XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            const nodes = [];
+            for (let i = 0; i < snapshot.snapshotLength; i++) nodes.push(snapshot.snapshotItem(i));
+            return nodes;
+        } catch (e) {
+            return [];
+        }
+    }
+    
+    // Same test as Selenium's element_to_be_clickable: displayed and enabled
+    function state(el) {
+        const style = getComputedStyle(el);
+        const rect = el.getBoundingClientRect();
+        const visible = rect.width > 0 && rect.height > 0 && style.display !== 'none' &&
+                        style.visibility !== 'hidden' && parseFloat(style.opacity) > 0;
+        const enabled = !el.disabled && el.getAttribute('aria-disabled') !== 'true' &&
+                        style.pointerEvents !== 'none';
+        return {visible: visible, clickable: visible && enabled};
+    }
+    
+    function evaluate(candidate) {
+        const nodes = matches(candidate);
+        let best = nodes.length ? nodes[0] : null, visible = false, clickable = false;
+        for (const el of nodes) {
+            const s = state(el);
+            if (s.clickable) { best = el; visible = clickable = true; break; }
+            if (s.visible && !visible) { best = el; visible = true; }
+        }
+        return {index: candidate.index, count: nodes.length, visible: visible, clickable: clickable, element: best};
+    }
+    
+    (function poll() {
+        const results = candidates.map(evaluate);
+        if (results.some(r => r.clickable) || performance.now() - start >= maxMs) {
+            results.sort((a, b) => (b.clickable - a.clickable) || (b.visible - a.visible) || (a.index - b.index));
+            done(results.filter(r => r.count > 0));
+        } else {
+            setTimeout(poll, 100);
+        }
+    })();
+"""
+
 class SeleniumScroller:
     
-    def __init__(self, headless=False, driver_path=r'C:\Program Files\chromedriver-win64\chromedriver.exe'):
+    def __init__(self, headless=False, driver_path=r'C:\Program Files\chromedriver-win64\chromedriver.exe', blocker=None, yield_rules=None):
         # Set up Chrome options
         chrome_options = Options()
+        # Return from get() at DOMContentLoaded; wait_for_settle covers whatever loads after that
+        chrome_options.page_load_strategy = 'eager'
         if headless:
             chrome_options.add_argument("--headless=new")  # New headless mode uses less memory
         chrome_options.add_argument("--no-sandbox")
@@ -38,6 +189,11 @@ class SeleniumScroller:
         chrome_options.add_argument("--disable-infobars")
         chrome_options.add_argument("--blink-settings=imagesEnabled=false")  # Disable images for even less memory
         
+        # Optional ResourceBlocker: CDP blocklist for fonts, media, ads and trackers
+        self.blocker = blocker
+        if blocker is not None:
+            blocker.configure_options(chrome_options)
+        
         # Initialize the Chrome driver with the specified path and keep_alive=True
         self.driver = webdriver.Chrome(
         service=Service(driver_path),
@@ -49,6 +205,85 @@ class SeleniumScroller:
         self.driver.set_page_load_timeout(300)
         self.driver.set_script_timeout(300)
         
+        if blocker is not None:
+            blocker.apply(self.driver)
+        
+        # URL of the page currently being rendered, for the per-page resource log
+        self.page_url = None
+        
+        # SiteProfile of the current page's domain (see crawler/site_profile.py), and whether
+        # this page probes every candidate or goes straight to the profile's known strategy
+        self.profile = None
+        self.probing = True
+        # Load-more selector found on the current page, if any
+        self.load_more_found = None
+        # Clickable pagination selector found on the current page, if any
+        self.page_link_found = None
+        
+        # Per-domain stopping thresholds, and the yield curves of the current page
+        self.yield_rules = yield_rules or YieldRules()
+        self.page_yield = None
+        # Pagination link of the current page left for the caller to fetch concurrently
+        self.url_pagination = None
+        
+        # Seconds waited after each scroll of the last scroll_to_bottom call
+        self.settle_times = []
+        
+        # Number of pages this browser has rendered (used by BrowserPool for recycling)
+        self.pages_served = 0
+        
+        # Set from another thread to abort the current page (see AsyncSeleniumScroller)
+        self.cancel_event = threading.Event()
+        
+    def pause(self, seconds):
+        """Sleep that returns early when the current page is cancelled"""
+        self.cancel_event.wait(seconds)
+        
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+        
+    def is_alive(self):
+        """Cheap health check: the driver session answers a trivial script"""
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except Exception as e:
+            logger.info(f"Browser health check failed: {e}")
+            return False
+        
+    def log_resource_savings(self):
+        """Log the requests and bytes saved by the blocker since the previous call"""
+        if self.blocker is None or not self.blocker.enabled:
+            return
+        page = self.blocker.collect(self.driver)
+        logger.info(
+            f"Resources for {self.page_url}: blocked {page['blocked']} requests "
+            f"(~{page['blocked_bytes'] / 1024:.0f} KB saved), loaded {page['requests']} "
+            f"({page['bytes'] / 1024:.0f} KB)"
+        )
+        
+    def reset(self):
+        """Clear state left behind by the previous page so the browser can be reused"""
+        try:
+            # Close any extra windows/tabs the page may have opened
+            handles = self.driver.window_handles
+            for handle in handles[1:]:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            self.driver.switch_to.window(handles[0])
+            
+            self.driver.delete_all_cookies()
+            self.driver.get("about:blank")
+            self.cancel_event.clear()
+            self.page_url = None
+            self.profile = None
+            self.page_yield = None
+            self.url_pagination = None
+            return True
+        except Exception as e:
+            logger.info(f"Error resetting browser: {e}")
+            return False
+        
     def safe_execute_script(self, script, max_retries=3):
         """Execute JavaScript with retry mechanism for timeouts"""
         for attempt in range(max_retries):
@@ -58,21 +293,96 @@ class SeleniumScroller:
                 if attempt == max_retries - 1:
                     raise  # Re-raise the last exception if all retries failed
                 logger.info(f"Script execution failed (attempt {attempt+1}/{max_retries}): {e}")
-                time.sleep(1)  # Wait before retrying
+                self.pause(1)  # Wait before retrying
+        
+    def wait_for_settle(self, max_wait, quiet_time=0.5, min_wait=0.3):
+        """
+        Wait until the page stops changing instead of sleeping a fixed time.
+        Returns the seconds actually waited; max_wait caps the wait.
+        """
+        started = time.perf_counter()
+        try:
+            self.driver.execute_script(SETTLE_TRACKER_SCRIPT)
+            result = self.driver.execute_async_script(
+                SETTLE_WAIT_SCRIPT,
+                int(quiet_time * 1000),
+                int(min_wait * 1000),
+                int(max_wait * 1000)
+            )
+            if result and not result.get('settled'):
+                logger.info(f"Page still busy after {max_wait}s, continuing")
+        except Exception as e:
+            # Fall back to the old fixed pause if the tracker cannot run
+            logger.info(f"Settle tracking failed, pausing {max_wait}s: {e}")
+            self.pause(max_wait)
+        return time.perf_counter() - started
+        
+    def probe_selectors(self, candidates, max_wait=1.5):
+        """
+        Probe (selector, is_xpath) candidates with one injected script instead of a WebDriverWait each.
+        Returns the candidates present on the page, best first: dicts with index (into candidates),
+        selector, count, visible, clickable and element.
+        """
+        if not candidates:
+            return []
+        payload = [{'index': i, 'selector': selector, 'xpath': xpath} for i, (selector, xpath) in enumerate(candidates)]
+        try:
+            ranked = self.driver.execute_async_script(SELECTOR_PROBE_SCRIPT, payload, int(max_wait * 1000))
+        except Exception as e:
+            logger.info(f"Selector probe failed: {e}")
+            return []
+        for result in ranked:
+            result['selector'] = candidates[result['index']][0]
+        return ranked
         
     def extract_and_clear_dom(self):
-        """Extract a tags and clear unnecessary DOM elements to save memory"""
-        return self.safe_execute_script("""
-            // First, collect all the <a> tags we want
-            const anchors = Array.from(document.querySelectorAll('a'));
-            const links = anchors.map(a => {
-                // Extract needed information (href, text, etc.)
-                return {
-                    href: a.href || '',
-                    text: a.textContent || '',
-                    outerHTML: a.outerHTML || ''
-                };
-            });
+        """
+        Extract the <a> tags added since the previous call as LinkRecords and clear unnecessary DOM elements.
+        The first call on a document scans every anchor; after that a MutationObserver
+        collects newly inserted anchors so only the delta crosses the chromedriver wire.
+        """
+        links = self.safe_execute_script("""
+            // Per-document state: anchors already returned and anchors added since the last call
+            let state = window.__crawlerLinks;
+            let candidates;
+            if (!state) {
+                state = window.__crawlerLinks = {seen: new WeakSet(), hrefs: new Set(), pending: []};
+                new MutationObserver(mutations => {
+                    for (const mutation of mutations) {
+                        // An anchor that got its href after insertion (hydration) is collected again
+                        if (mutation.type === 'attributes') {
+                            if (mutation.target.tagName === 'A') state.pending.push(mutation.target);
+                            continue;
+                        }
+                        for (const node of mutation.addedNodes) {
+                            if (node.nodeType !== Node.ELEMENT_NODE) continue;
+                            if (node.tagName === 'A') {
+                                state.pending.push(node);
+                            } else {
+                                for (const a of node.getElementsByTagName('a')) state.pending.push(a);
+                            }
+                        }
+                    }
+                }).observe(document.documentElement, {childList: true, subtree: true, attributes: true, attributeFilter: ['href']});
+                candidates = document.getElementsByTagName('a');
+            } else {
+                candidates = state.pending;
+                state.pending = [];
+            }
+            
+            // Collect only anchors (and hrefs) we have not returned before; an anchor without an
+            // href yet is not marked seen, so it is picked up once its href is set
+            const links = [];
+            for (const a of candidates) {
+                if (state.seen.has(a)) continue;
+                const href = a.href || '';
+                if (!href) continue;
+                state.seen.add(a);
+                if (state.hrefs.has(href)) continue;
+                state.hrefs.add(href);
+                // Collapse whitespace and cut to url_content's VARCHAR(100) before it crosses the wire
+                links.push([href, (a.textContent || '').replace(/\s+/g, ' ').trim().slice(0, 100)]);
+            }
             
             // Now clean up the DOM
             // 1. Remove all images (they consume a lot of memory)
@@ -106,14 +416,6 @@ class SeleniumScroller:
                 el.innerHTML = '';
             });
             
-            // 4. Remove event listeners (can cause memory leaks)
-            const allElements = document.querySelectorAll('*');
-            allElements.forEach(el => {
-                el.onclick = null;
-                el.onmouseover = null;
-                el.onmouseout = null;
-            });
-            
             // Force garbage collection if possible
             if (window.gc) {
                 window.gc();
@@ -121,6 +423,7 @@ class SeleniumScroller:
             
             return links;
         """)
+        return [LinkRecord.from_raw(href, text) for href, text in links or []]
 
     def check_and_click_load_more(self):
         """
@@ -128,27 +431,18 @@ class SeleniumScroller:
         Returns True if a button was clicked and content was loaded, False otherwise.
         """
         try:
-            # Try the four selectors
-            selectors = [
-                "[onclick*='loadMore']",           # Original
-                "button.ant-btn.ant-btn-primary.w-fit",  # Pattern 1
-                "button.load__moreGrid",           # Pattern 2  
-                "a.td_ajax_load_more", 
-                "button#btnLoadMore"
-            ]
-            
-            element = None
-            for selector in selectors:
-                try:
-                    element = WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                    )
-                    break
-                except (TimeoutException, NoSuchElementException):
-                    continue
+            if self.probing:
+                selectors = LOAD_MORE_SELECTORS
+            else:
+                # '' means the profile knows this site has no load-more button
+                selectors = [self.profile.load_more_selector] if self.profile.load_more_selector else []
             
-            if not element:
+            # One probe of every selector with a short polling window
+            ranked = self.probe_selectors([(selector, False) for selector in selectors], max_wait=2.0)
+            if not ranked or not ranked[0]['clickable']:
                 return False
+            element = ranked[0]['element']
+            self.load_more_found = ranked[0]['selector']
             
            
             # Get current page height before clicking
@@ -159,7 +453,7 @@ class SeleniumScroller:
             
             # Scroll to element
             self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
-            time.sleep(1)
+            self.pause(1)
             
             # Try to click
             click_successful = False
@@ -173,7 +467,7 @@ class SeleniumScroller:
             
             if click_successful:
                 # Wait for potential content to load
-                time.sleep(1.5)
+                self.wait_for_settle(max_wait=1.5)
                 
                 # Check if new content was actually loaded
                 try:
@@ -198,35 +492,48 @@ class SeleniumScroller:
             logger.info(f"Error clicking loadMore button: {e}")
             return False
 
-    def scroll_to_bottom(self, url, scroll_pause_time=1.0, max_scrolls=200):
+    def scroll_to_bottom(self, url, scroll_pause_time=1.0, max_scrolls=200, profile=None):
         logger.info(f'Scrolling page: {url}')
+        self.page_url = url
+        self.profile = profile
+        self.probing = profile is None or profile.start_page()
+        self.load_more_found = None
+        self.page_link_found = None
+        self.page_yield = self.yield_rules.for_url(url)
+        self.url_pagination = None
         try:
             self.driver.get(url)
-            time.sleep(2.5)  
+            self.wait_for_settle(max_wait=2.5)
             
       
             loadmore_clicked = False
             consecutive_failed_loadmore = 0
             max_failed_loadmore = 1
             
-            while consecutive_failed_loadmore < max_failed_loadmore:
+            while consecutive_failed_loadmore < max_failed_loadmore and not self.cancelled:
                 loadmore_result = self.check_and_click_load_more()
                 if loadmore_result:
                     logger.info("Successfully clicked loadMore button, content loaded")
                     loadmore_clicked = True
                     consecutive_failed_loadmore = 0 
-                    time.sleep(1) 
+                    self.pause(1) 
                 else:
                     consecutive_failed_loadmore += 1
                     logger.info(f"LoadMore attempt failed ({consecutive_failed_loadmore}/{max_failed_loadmore})")
                     if consecutive_failed_loadmore < max_failed_loadmore:
-                        time.sleep(1.5) 
+                        self.pause(1.5) 
             
             if loadmore_clicked:
                 logger.info("LoadMore phase completed, now starting scroll phase")
             else:
                 logger.info("LoadMore phase ended after a failed attempt")
             
+            if self.profile is not None:
+                if self.probing:
+                    self.profile.learn(load_more_selector=self.load_more_found or '')
+                elif self.profile.load_more_selector and not self.load_more_found:
+                    self.profile.invalidate("known load-more button not found")
+            
         except Exception as e:
             logger.info(f"Failed to load page: {e}")
             return None
@@ -238,25 +545,40 @@ class SeleniumScroller:
             logger.info(f"Error getting initial scroll height: {e}")
             return None
             
+        # A page of a site known not to grow on scroll only needs the one scroll for lazy content
+        if self.profile is not None and not self.probing and self.profile.scroll_mode == 'static':
+            max_scrolls = 1
+        first_height = last_height
+        
         scrolls_performed = 0
         scrolling_links = set()  # For deduplication
+        # Seconds actually waited after each scroll; scroll_pause_time is only the cap now
+        self.settle_times = []
+        # New same-domain links per scroll; the feed is abandoned once scrolls stop paying off
+        tracker = self.page_yield.track('scroll', 'scroll')
         
         # Now start the scrolling phase
         while True:
+            if self.cancelled:
+                logger.info("Scrolling cancelled")
+                tracker.stop('cancelled')
+                break
+            
             if max_scrolls and scrolls_performed >= max_scrolls:
                 logger.info(f"Reached maximum number of scrolls: {max_scrolls}")
+                tracker.stop('max_scrolls')
                 break
             
+            links = []
             try:
                 # Scroll to the bottom of the page to load lazy content
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(scroll_pause_time)
+                self.settle_times.append(self.wait_for_settle(max_wait=scroll_pause_time))
                 
                 # Extract links and clean DOM
                 links = self.extract_and_clear_dom()
                 
-                for link in links:
-                    scrolling_links.add(link['outerHTML'])
+                scrolling_links.update(links)
                 
                 
                
@@ -274,13 +596,44 @@ class SeleniumScroller:
                 break
 
             scrolls_performed += 1
-            logger.info(f"Scroll #{scrolls_performed} - Height: {new_height}")
+            new_links = tracker.observe(links)
+            logger.info(f"Scroll #{scrolls_performed} - Height: {new_height} - {new_links} new links")
             
             if new_height == last_height:
-                logger.info("Reached the bottom of the page")
-                break
+                # Lazy loaders can start late; give the page one more settle window before giving up
+                extra_wait = self.wait_for_settle(max_wait=scroll_pause_time)
+                if self.settle_times:
+                    self.settle_times[-1] += extra_wait
+                try:
+                    new_height = self.safe_execute_script("return document.body.scrollHeight")
+                except Exception as e:
+                    logger.info(f"Error while getting scroll height: {e}")
+                    break
+                
+                if new_height == last_height:
+                    logger.info("Reached the bottom of the page")
+                    tracker.stop('bottom')
+                    break
                 
             last_height = new_height
+            
+            if tracker.exhausted:
+                logger.info(f"Stopping after {scrolls_performed} scrolls ({tracker.stop_reason}): last yields {tracker.curve[-5:]}")
+                break
+        
+        if self.profile is not None:
+            grew = last_height != first_height
+            if self.probing:
+                self.profile.learn(scroll_mode='infinite' if grew else 'static')
+            elif grew and self.profile.scroll_mode == 'static':
+                self.profile.invalidate("static page grew on scroll")
+        
+        if self.settle_times:
+            waited = sum(self.settle_times)
+            logger.info(
+                f"Scroll settling: {len(self.settle_times)} scrolls waited {waited:.1f}s "
+                f"(fixed pauses would have been {len(self.settle_times) * scroll_pause_time:.1f}s)"
+            )
         
         try:
             # Instead of returning the full page source (which could be huge),
@@ -295,42 +648,33 @@ class SeleniumScroller:
       
         try:
             
-            # Try the four selectors
-            selectors = [
-                f"a[id='{page_num}']",
-                "li.next a[href]"
-            
-            ]
-            
-            element = None
-            for selector in selectors:
-                try:
-                    element = WebDriverWait(self.driver, 2).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                    )
-                    break
-                except (TimeoutException, NoSuchElementException):
-                    continue
+            if self.probing or self.profile.pagination_mode != 'clickable':
+                templates = PAGE_LINK_SELECTORS
+            else:
+                templates = [self.profile.pagination_selector]
             
-            if not element:
+            ranked = self.probe_selectors([(template.format(page=page_num), False) for template in templates], max_wait=1.0)
+            if not ranked or not ranked[0]['clickable']:
                 return False
+            element = ranked[0]['element']
+            self.page_link_found = templates[ranked[0]['index']]
         
             
             # Scroll to element
             self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
-            time.sleep(1)
+            self.pause(1)
             
             # Try to click
             try:
                 element.click()
                 logger.info(f"Successfully clicked page {page_num}")
-                time.sleep(1.5)  # Wait for page to load
+                self.pause(1.5)  # Wait for page to load
                 return True
             except ElementClickInterceptedException:
                 # Try JavaScript click
                 self.driver.execute_script("arguments[0].click();", element)
                 logger.info(f"Successfully clicked page {page_num} using JavaScript")
-                time.sleep(1.5)
+                self.pause(1.5)
                 return True
                 
         except (TimeoutException, NoSuchElementException) as e:
@@ -338,23 +682,74 @@ class SeleniumScroller:
             return False
         
             
-    def pagination(self):      
+    def page_not_found(self, page_url):
+        """Whether a numbered page came back as a 404 or redirected away"""
+        # Check if page contains 404 indicators
+        page_source = self.driver.page_source.lower()
+        return ("page not found" in page_source or
+                "Oops! Something went wrong here." in page_source or 
+                self.driver.current_url != page_url)  # URL redirect might indicate 404
+        
+    def load_page_links(self, url):
+        """One numbered listing page for the concurrent pager: ('ok', links) or ('not_found', [])"""
+        logger.info(f"Loading page: {url}")
+        self.page_url = url
+        self.driver.get(url)
+        self.wait_for_settle(max_wait=1.5)
+        if self.page_not_found(url):
+            return 'not_found', []
+        return 'ok', self.extract_and_clear_dom()
+        
+    def learn_pagination(self, mode, selector=None):
+        """Record the pagination mode this page used, or flag the profile if its known mode failed"""
+        if self.profile is None:
+            return
+        if self.probing:
+            self.profile.learn(pagination_mode=mode, pagination_selector=selector)
+        elif mode != self.profile.pagination_mode:
+            self.profile.invalidate(f"expected {self.profile.pagination_mode} pagination, found {mode}")
+            
+    def pagination(self, defer_url_pages=False):
+        """
+        Follow the page's pagination and return (True, links). With defer_url_pages, URL-based
+        pagination is only detected: the page-number link is left in url_pagination for the
+        caller to fetch concurrently (see crawler/parallel_pager.py).
+        """
         pagination_links = set()
+        known_mode = None if self.probing or self.profile is None else self.profile.pagination_mode
+        
+        if known_mode == 'none':
+            logger.info("Site profile: this site has no pagination, skipping")
+            return True, list(pagination_links)
         
         try:
           
             # Wait for page to load
-            time.sleep(1.5)
+            self.pause(1.5)
+            
+            if known_mode is None:
+                # One probe for every pagination pattern decides which paths are worth trying
+                page_link_candidates = [(template.format(page=page), False) for page in (1, 2) for template in PAGE_LINK_SELECTORS]
+                ranked = self.probe_selectors(page_link_candidates + [(PAGE_URL_XPATH, True)], max_wait=1.0)
+                if not ranked:
+                    logger.info("No pagination elements found")
+                    self.learn_pagination('none')
+                    return True, list(pagination_links)
+                if all(result['index'] == len(page_link_candidates) for result in ranked):
+                    known_mode = 'url'
             
-            # Try clickable pagination first
+            # Try clickable pagination first (unless the site is known to use page URLs)
             current_page = 0 
             clickable_pagination_worked = False
+            if known_mode != 'url':
+                tracker = self.page_yield.track('clickable', 'pages')
             
-            while True: 
+            while not self.cancelled and known_mode != 'url': 
                 current_page += 1  
                 
                 if not self.check_and_click_clickable_page_element(current_page):
                     logger.info(f"Could not navigate to page {current_page}, ending scraping")
+                    tracker.stop('no_next_page')
                     break
                 
                 # Mark that clickable pagination is working
@@ -362,23 +757,21 @@ class SeleniumScroller:
                     clickable_pagination_worked = True
                 
                 links = self.extract_and_clear_dom()
-                new_links_added = 0
-                for link in links:
-                    if link['outerHTML'] not in pagination_links:
-                        pagination_links.add(link['outerHTML'])
-                        new_links_added += 1
+                pagination_links.update(links)
+                new_links = tracker.observe(links)
                 
-                logger.info(f"Page {current_page}: Found {len(links)} total links, {new_links_added} new links")
+                logger.info(f"Page {current_page}: Found {len(links)} total links, {new_links} new links")
                 
-                if new_links_added <= 3:
-                            logger.info(f"Page {current_page}: No new links found, stopping pagination")
-                            break
+                if tracker.exhausted:
+                    logger.info(f"Page {current_page}: stopping pagination ({tracker.stop_reason}), last yields {tracker.curve[-5:]}")
+                    break
 
             logger.info(f"\nScraping completed. Processed {current_page} pages.")
 
             # If clickable pagination worked (more than 1 page processed), return results
             if clickable_pagination_worked:
                 logger.info(f"Found {current_page} pages via clickable pagination, returning results")
+                self.learn_pagination('clickable', self.page_link_found)
                 return True, list(pagination_links)
             else:
                 logger.info("Only 1 page found via clickable pagination, continuing to URL-based pagination check")
@@ -387,12 +780,13 @@ class SeleniumScroller:
             try:
                 # Go back to first page to detect pagination links
                 # self.driver.get(category_url)
-                time.sleep(1)
+                self.pause(1)
                 
                 # Find total number of pages
                 total_pages = 1
+                page_links = []
                 try:
-                    page_links = self.driver.find_elements(By.XPATH,  "//a[(contains(@href, 'cat=') and contains(@href, 'paged=')) or (contains(@href, 'category_id=') and contains(@href, 'page=')) or contains(@href, '/page/') or contains(@href, 'page=') or (contains(@href, 'per=') and contains(@href, 'p=')) ]")
+                    page_links = self.driver.find_elements(By.XPATH, PAGE_URL_XPATH)
                     
                     for link in page_links:
                         text = link.text.strip().replace(',', '')
@@ -408,19 +802,21 @@ class SeleniumScroller:
                     logger.info("Defaulting to 1 page")
                     total_pages = 1
                 
+                if not page_links:
+                    logger.info("No pagination links found")
+                    self.learn_pagination('none')
+                    return True, list(pagination_links)
         
                 first_link = page_links[0].get_attribute('href')
                 
-                pattern = re.compile(r'(paged=|page[/=]|p=)(\d+)')
-                
-                if not pattern.search(first_link):
+                if not PAGE_NUMBER_PATTERN.search(first_link):
                     logger.info("First link doesn't contain pagination pattern, searching other links...")
                     
                     # Loop through links 0-10 to find one with pagination pattern
                     for i in range(min(10, len(page_links))):
                         try:
                             link = page_links[i].get_attribute('href')
-                            if pattern.search(link):
+                            if PAGE_NUMBER_PATTERN.search(link):
                                 first_link = link
                                 logger.info(f"Found pagination pattern in link {i}: {link}")
                                 break
@@ -428,81 +824,57 @@ class SeleniumScroller:
                             continue
                     else:
                         logger.info("No pagination pattern found in first 10 links")
+                        self.learn_pagination('none')
                         return True, list(pagination_links)
+                
+                self.learn_pagination('url')
+                
+                if defer_url_pages:
+                    logger.info(f"URL-based pagination detected ({total_pages} pages shown), leaving it to the concurrent pager")
+                    self.url_pagination = first_link
+                    return True, list(pagination_links)
                             
-                if total_pages > 0 and total_pages < 31:
-                    page_num = 2
-                    while True:
-                        page_url = pattern.sub(lambda m: f"{m.group(1)}{page_num}", first_link)
-                        logger.info(f'URL: {page_url}')
-                        logger.info(f"Navigating to page {page_num}: {page_url}")
-                        
-                        # Navigate to the next page
-                        self.driver.get(page_url)
-                        
-                        # Wait for page to load
-                        time.sleep(1.5)
-                        
-                        # Check for 404 or page not found
-                        try:
-                            # Check if page contains 404 indicators
-                            page_source = self.driver.page_source.lower()
-                            if ("page not found" in page_source or
-                                "Oops! Something went wrong here." in page_source or 
-                                self.driver.current_url != page_url):  # URL redirect might indicate 404
-                                logger.info(f"Page {page_num}: 404 or page not found detected")
-                                break
-                        except Exception as e:
-                            logger.info(f"Error checking page status: {e}")
-                            break
-                        
-                        # Parse the page
-                        links = self.extract_and_clear_dom()
-                        
-                        # Add new links and check if any were actually added
-                        new_links_added = 0
-                        for link in links:
-                            link_html = link['outerHTML']
-                            if link_html not in pagination_links:
-                                pagination_links.add(link_html)
-                                new_links_added += 1
-                        
-                        logger.info(f"Page {page_num}: Found {len(links)} total links, {new_links_added} new links added")
+                # Pages are followed while they keep yielding new links; the domain's
+                # max_steps caps the walk, since pagers often show only nearby page numbers
+                tracker = self.page_yield.track('url', 'pages')
+                page_num = 2
+                while not self.cancelled:
+                    page_url = numbered_page_url(first_link, page_num)
+                    logger.info(f"Navigating to page {page_num}: {page_url}")
+                    
+                    # Navigate to the next page
+                    self.driver.get(page_url)
                     
-                        # Break if no new links were added
-                        if new_links_added < 5:
-                            logger.info(f"Page {page_num}: No new links found, stopping pagination")
+                    # Wait for page to load
+                    self.pause(1.5)
+                    
+                    # Check for 404 or page not found
+                    try:
+                        if self.page_not_found(page_url):
+                            logger.info(f"Page {page_num}: 404 or page not found detected")
+                            tracker.stop('not_found')
                             break
-                        
-                        # Move to next page
-                        page_num += 1
-                            
-                    return True, list(pagination_links)
-                        
-                else:
-                    for page_num in range(2, total_pages + 1):
-                        try:
-                            page_url = pattern.sub(lambda m: f"{m.group(1)}{page_num}", first_link)
-                            logger.info(f'URL: {page_url}')
-                            logger.info(f"Navigating to page {page_num}/{total_pages}: {page_url}")
-                            
-                            # Navigate to the next page
-                            self.driver.get(page_url)
-                            
-                            # Wait for page to load
-                            time.sleep(1.5)
-                            
-                            # Parse the page
-                            links = self.extract_and_clear_dom()
-                            for link in links:
-                                pagination_links.add(link['outerHTML'])
-                            logger.info(f"Page {page_num}: Found {len(links)} article links")
-                                
-                        except Exception as e:
-                            logger.info(f"Error processing page {page_num}: {e}")
-                            continue
+                    except Exception as e:
+                        logger.info(f"Error checking page status: {e}")
+                        tracker.stop('error')
+                        break
                     
-                    return True, list(pagination_links)
+                    # Parse the page
+                    links = self.extract_and_clear_dom()
+                    pagination_links.update(links)
+                    new_links = tracker.observe(links)
+                    logger.info(f"Page {page_num}: Found {len(links)} total links, {new_links} new links added")
+                    
+                    if tracker.exhausted:
+                        logger.info(f"Page {page_num}: stopping pagination ({tracker.stop_reason}), last yields {tracker.curve[-5:]}")
+                        break
+                    
+                    # Move to next page
+                    page_num += 1
+                
+                if self.cancelled:
+                    tracker.stop('cancelled')
+                return True, list(pagination_links)
                             
             except Exception as e:
                 logger.info(f"Error in URL-based pagination: {e}")
@@ -511,17 +883,15 @@ class SeleniumScroller:
         except Exception as e:
             logger.info(f"Error in extract_links: {e}")
             return True, list(pagination_links)
-            
-        
-        finally:
-            self.driver.quit()
 
             
     def close(self):
         
+        self.cancel_event.set()
         if self.driver:
+            driver, self.driver = self.driver, None
             try:
-                self.driver.quit()
+                driver.quit()
             except Exception as e:
                 logger.info(f"Error closing driver: {e}")
 
@@ -0,0 +1,244 @@
+import asyncio
+import time
+import aiohttp
+import lxml.html
+from collections import Counter
+from urllib.parse import urlparse
+from middleware.scroller_pager import LOAD_MORE_SELECTORS, PAGE_LINK_SELECTORS, is_page_url
+from middleware.link_record import LinkRecord
+from status.logger import logger
+
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/125.0 Safari/537.36"
+)
+
+# Markup that usually means the page appends content with JavaScript while scrolling
+INFINITE_SCROLL_MARKERS = [
+    "infinite-scroll",
+    "infinite_scroll",
+    "infinitescroll",
+    "data-infinite",
+    "ajax_load_more",
+    "load-more",
+    "loadmore",
+]
+
+# Fewer same-domain links than this on a server-rendered page is treated as "content comes from JS"
+MIN_STATIC_LINKS = 15
+
+
+def same_domain(url, base_domain):
+    return urlparse(url).netloc.replace('www.', '') == base_domain.replace('www.', '')
+
+
+class StaticFetcher:
+    """
+    HTTP fast path: fetch a page with a pooled aiohttp session and pull its links with lxml.
+
+    fetch_links() returns None when the page looks JavaScript dependent, so the caller
+    falls back to SeleniumScroller. Once a domain needs the browser, that decision is
+    cached and later pages of the domain skip the HTTP attempt.
+    """
+
+    def __init__(self, concurrency=20, timeout=20, min_links=MIN_STATIC_LINKS):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.min_links = min_links
+        self._session = None
+
+        # domain -> 'static' or 'browser'
+        self.domain_mode = {}
+        self.stats = Counter()
+        self.escalation_reasons = Counter()
+
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=4, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
+            )
+        return self._session
+
+    async def fetch(self, url, headers=None):
+        """GET a page; returns (status, html, final_url, response_headers) or None on network errors"""
+        session = await self._get_session()
+        try:
+            async with session.get(url, headers=headers, allow_redirects=True) as response:
+                content_type = response.headers.get("Content-Type", "")
+                if response.status == 200 and "html" not in content_type:
+                    return response.status, None, str(response.url), response.headers
+                html = await response.text(errors="replace") if response.status == 200 else None
+                return response.status, html, str(response.url), response.headers
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.info(f"Static fetch failed for {url}: {e}")
+            return None
+
+    async def revalidate(self, url, etag=None, last_modified=None):
+        """
+        Conditional GET with the validators stored at the last visit.
+        Returns (status, etag, last_modified, fetched) - status 304 means the page did not change,
+        otherwise fetched is the fetch() result to hand to fetch_links() - or None on network errors.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        result = await self.fetch(url, headers=headers)
+        if result is None:
+            return None
+        status, _, _, response_headers = result
+        self.stats["not_modified" if status == 304 else "revalidated"] += 1
+        return (
+            status,
+            response_headers.get("ETag") or etag,
+            response_headers.get("Last-Modified") or last_modified,
+            result,
+        )
+
+    def extract_links(self, doc):
+        """LinkRecords for every <a href> of an lxml document (links already made absolute)"""
+        links = []
+        for a in doc.iter("a"):
+            href = a.get("href")
+            if href:
+                links.append(LinkRecord.from_raw(href, a.text_content()))
+        return links
+
+    def needs_browser(self, doc, html, url):
+        """Return the reason this page needs JavaScript rendering, or None if the static HTML is enough"""
+        for selector in LOAD_MORE_SELECTORS:
+            try:
+                if doc.cssselect(selector):
+                    return "load_more"
+            except Exception:
+                continue
+
+        # Pagination that only works by clicking; numbered page URLs are walked over HTTP instead
+        if not any(is_page_url(a.get("href") or "") for a in doc.iter("a")):
+            for template in PAGE_LINK_SELECTORS:
+                try:
+                    if doc.cssselect(template.format(page=2)):
+                        return "clickable_pagination"
+                except Exception:
+                    continue
+
+        lowered = html.lower()
+        for marker in INFINITE_SCROLL_MARKERS:
+            if marker in lowered:
+                return "infinite_scroll"
+
+        base_domain = urlparse(url).netloc
+        link_count = sum(1 for a in doc.iter("a") if a.get("href") and same_domain(a.get("href"), base_domain))
+        if link_count < self.min_links:
+            return "few_links"
+
+        return None
+
+    def escalate(self, domain, reason):
+        self.domain_mode[domain] = "browser"
+        self.stats["escalated"] += 1
+        self.escalation_reasons[reason] += 1
+
+    async def fetch_links(self, url, fetched=None):
+        """
+        Links of a page fetched over plain HTTP as (links, etag, last_modified), or None if the
+        browser should render it. fetched is a response already in hand (from revalidate()).
+        """
+        domain = urlparse(url).netloc
+        if self.domain_mode.get(domain) == "browser":
+            self.stats["skipped"] += 1
+            return None
+
+        started = time.perf_counter()
+        result = fetched or await self.fetch(url)
+        if result is None:
+            self.escalate(domain, "network_error")
+            return None
+
+        status, html, final_url, response_headers = result
+        if status != 200 or not html:
+            # Let the browser decide what a non-HTML or error response really is
+            self.stats["escalated"] += 1
+            self.escalation_reasons[f"status_{status}"] += 1
+            return None
+
+        try:
+            doc = lxml.html.document_fromstring(html, base_url=final_url)
+            doc.make_links_absolute(final_url, resolve_base_href=True)
+        except Exception as e:
+            logger.info(f"Static parse failed for {url}: {e}")
+            self.escalate(domain, "parse_error")
+            return None
+
+        reason = self.needs_browser(doc, html, final_url)
+        if reason:
+            logger.info(f"{url} needs the browser ({reason}); using Selenium for {domain}")
+            self.escalate(domain, reason)
+            return None
+
+        self.domain_mode.setdefault(domain, "static")
+        links = self.extract_links(doc)
+        self.stats["static"] += 1
+        logger.info(f"Static fetch of {url}: {len(links)} links in {time.perf_counter() - started:.2f}s")
+        return links, response_headers.get("ETag"), response_headers.get("Last-Modified")
+
+    def numbered_page_link(self, url, links):
+        """
+        The same-domain link of a page's URL-based pagination (?page=, ?paged=, /page/N), or None.
+        Links whose text is a page number are preferred, as pagination() does in the browser.
+        """
+        base_domain = urlparse(url).netloc
+        candidates = [link for link in links if is_page_url(link.href) and same_domain(link.href, base_domain)]
+        numbered = [link for link in candidates if link.text.replace(',', '').isdigit()]
+        best = numbered or candidates
+        return best[0].href if best else None
+
+    async def fetch_listing_page(self, url):
+        """
+        One numbered page of URL-based pagination over plain HTTP: ('not_found', []) for a 404
+        or a redirect away from the page, ('ok', links) when the HTML carries enough links,
+        None if the browser should render it. The domain's browser decision is not consulted:
+        numbered listing pages are usually server-rendered even when the first page scrolls.
+        """
+        result = await self.fetch(url)
+        if result is None:
+            return None
+
+        status, html, final_url, _ = result
+        if status in (404, 410) or (status == 200 and final_url != url):
+            self.stats["listing_not_found"] += 1
+            return 'not_found', []
+        if status != 200 or not html:
+            return None
+
+        try:
+            doc = lxml.html.document_fromstring(html, base_url=final_url)
+            doc.make_links_absolute(final_url, resolve_base_href=True)
+        except Exception as e:
+            logger.info(f"Static parse failed for {url}: {e}")
+            return None
+
+        base_domain = urlparse(final_url).netloc
+        links = self.extract_links(doc)
+        if sum(1 for link in links if same_domain(link.href, base_domain)) < self.min_links:
+            return None
+        self.stats["listing_pages"] += 1
+        return 'ok', links
+
+    def log_metrics(self):
+        logger.info(
+            f"Static fetcher: static={self.stats['static']} escalated={self.stats['escalated']} "
+            f"skipped={self.stats['skipped']} not_modified={self.stats['not_modified']} "
+            f"revalidated={self.stats['revalidated']} listing_pages={self.stats['listing_pages']} "
+            f"reasons={dict(self.escalation_reasons)}"
+        )
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self.log_metrics()
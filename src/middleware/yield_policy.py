@@ -0,0 +1,134 @@
+import json
+from urllib.parse import urlsplit
+from status.logger import logger
+
+
+# Stopping thresholds applied to every domain unless the seed config overrides them.
+# A step (one scroll, or one page of pagination) is "dry" when it adds fewer than
+# min_new_links new same-domain links; a sequence stops after `patience` dry steps in a row.
+DEFAULT_YIELD_RULES = {
+    'scroll': {
+        'min_new_links': 3,
+        'patience': 3,
+        'warmup': 1,          # steps that never count as dry (the first scroll often only starts lazy loading)
+        'max_steps': 200,
+    },
+    'pages': {
+        'min_new_links': 4,
+        'patience': 1,
+        'warmup': 0,
+        'max_steps': 30,
+    },
+}
+
+
+def site_host(url):
+    """Host of a URL without www., for same-domain checks and override lookups"""
+    host = (urlsplit(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class YieldTracker:
+    """Marginal yield of one scroll or pagination sequence, and whether it is worth continuing"""
+
+    def __init__(self, rules, host, seen):
+        self.min_new_links = rules['min_new_links']
+        self.patience = rules['patience']
+        self.warmup = rules['warmup']
+        self.max_steps = rules['max_steps']
+        self.host = host
+        # Shared with the page's other sequences of the same kind, so a link only counts once
+        self.seen = seen
+        self.curve = []
+        self.dry_steps = 0
+        self.stop_reason = None
+
+    def observe(self, links):
+        """Count the new same-domain links of one step; returns that count"""
+        new_links = 0
+        for link in links:
+            if link.href in self.seen:
+                continue
+            self.seen.add(link.href)
+            host = site_host(link.href)
+            if host == self.host or host.endswith('.' + self.host):
+                new_links += 1
+        self.curve.append(new_links)
+        if len(self.curve) > self.warmup and new_links < self.min_new_links:
+            self.dry_steps += 1
+        else:
+            self.dry_steps = 0
+        return new_links
+
+    @property
+    def exhausted(self):
+        if self.dry_steps >= self.patience:
+            self.stop_reason = self.stop_reason or 'low_yield'
+            return True
+        if len(self.curve) >= self.max_steps:
+            self.stop_reason = self.stop_reason or 'max_steps'
+            return True
+        return False
+
+    def stop(self, reason):
+        """Record why the sequence ended when something other than the policy ended it"""
+        self.stop_reason = self.stop_reason or reason
+
+
+class PageYield:
+    """Yield trackers of one rendered URL, one per sequence ('scroll', 'clickable', 'url')"""
+
+    def __init__(self, url, rules):
+        self.url = url
+        self.host = site_host(url)
+        self.rules = rules
+        self.seen = {}
+        self.trackers = {}
+
+    def track(self, sequence, kind):
+        """Start a sequence using the 'scroll' or 'pages' thresholds"""
+        tracker = YieldTracker(self.rules[kind], self.host, self.seen.setdefault(kind, set()))
+        self.trackers[sequence] = tracker
+        return tracker
+
+    def as_dict(self):
+        """The yield curve to store with the URL for offline tuning"""
+        return {
+            sequence: {'new_links': tracker.curve, 'stop': tracker.stop_reason}
+            for sequence, tracker in self.trackers.items()
+        }
+
+
+class YieldRules:
+    """DEFAULT_YIELD_RULES merged with optional per-domain overrides"""
+
+    def __init__(self, default=None, overrides=None):
+        self._default = self._merge(DEFAULT_YIELD_RULES, default or {})
+        self._overrides = {
+            site_host('https://' + domain): self._merge(self._default, rules)
+            for domain, rules in (overrides or {}).items()
+        }
+
+    @staticmethod
+    def _merge(base, changes):
+        return {kind: dict(base[kind], **changes.get(kind, {})) for kind in base}
+
+    def for_url(self, url):
+        """A PageYield for one page, with its domain's thresholds"""
+        host = site_host(url)
+        rules = self._overrides.get(host, self._default)
+        return PageYield(url, rules)
+
+
+def load_yield_rules(path='assests/seed_domain.json'):
+    """Build YieldRules from the optional "yield_policy" section of the seed config"""
+    try:
+        with open(path, 'r') as f:
+            config = json.load(f).get('yield_policy', {})
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read yield policy from {path}, using defaults: {e}")
+        config = {}
+
+    rules = YieldRules(config.get('default'), config.get('overrides'))
+    logger.info(f"Loaded yield policy ({len(rules._overrides)} domain overrides)")
+    return rules
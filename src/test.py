@@ -1,12 +1,14 @@
 from database.setup import get_connection, return_connection, close_all_connections
+from database.identity import parse_id
 import asyncio
 import networkx as nx
 import plotly.graph_objects as go
 import numpy as np
 from collections import Counter
 
-async def fetch_url_path_relations(conn):
+async def fetch_url_path_relations(conn, domain='domain154'):
     """Fetch URL path relationships using the specified query"""
+    domain_id = parse_id('domain', domain)
     async with conn.cursor() as cursor:
         await cursor.execute("""
             SELECT 
@@ -15,9 +17,9 @@ async def fetch_url_path_relations(conn):
             FROM url_relationship ur
             JOIN crawled_url p_url ON ur.parent_url_id = p_url.crawl_id
             JOIN crawled_url c_url ON ur.child_url_id = c_url.crawl_id
-            WHERE p_url.domain_id = 'domain154' OR c_url.domain_id = 'domain154'
+            WHERE p_url.domain_id = %s OR c_url.domain_id = %s
             LIMIT 5000
-        """)
+        """, (domain_id, domain_id))
         return await cursor.fetchall()
 
 def create_fast_network_graph(relations):